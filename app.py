@@ -1,45 +1,336 @@
 import os
 import re
+import sys
+import codecs
 import tempfile
-import glob
+import time
+import json
+import gzip
+import math
+import importlib
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed, wait, FIRST_COMPLETED
 from urllib.parse import urlparse, parse_qs
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+from pipeline import claim_index, llm_cache, run_claim_pipeline
+import metrics
+from circuit_breaker import Router
+from job_queue import JobQueue, QueueFull
+from singleflight import SingleFlight
+from transcript import Transcript, TranscriptBuilder
+from transcript_cache import TranscriptCache
+from transcript_index import TranscriptIndex
+from ttl_cache import TTLCache
+from verdict_engine import VerdictEngine, WindowedVerdict, load_lexicon
+from vtt_parser import iter_vtt_cues
+
 # transcript libs
 from youtube_transcript_api import (
     YouTubeTranscriptApi,
     TranscriptsDisabled,
     NoTranscriptFound,
+    NoTranscriptAvailable,
+    VideoUnavailable,
+    InvalidVideoId,
+    TooManyRequests,
+    YouTubeRequestFailed,
 )
 
-# Google API (may be optional if you prefer yt-dlp metadata fallback)
+# brotli (optional; /transcript falls back to gzip without it)
 try:
-    from googleapiclient.discovery import build
+    import brotli
 except Exception:
-    build = None
+    brotli = None
+
+# Google API (may be optional if you prefer yt-dlp metadata fallback) and
+# yt-dlp (optional; helps retrieve auto-subtitles & metadata when youtube_transcript_api fails)
+# are heavy imports, so they are loaded on first use instead of at worker startup.
+_optional = {}
+_optional_lock = threading.Lock()
+
+
+def _optional_import(module, attr):
+    """module.attr imported once and cached; None if the package isn't installed."""
+    key = (module, attr)
+    if key not in _optional:
+        with _optional_lock:
+            if key not in _optional:
+                try:
+                    _optional[key] = getattr(importlib.import_module(module), attr)
+                except Exception as e:
+                    print(f"DEBUG: optional backend {module} unavailable:", repr(e))
+                    _optional[key] = None
+    return _optional[key]
+
+
+def google_build():
+    """googleapiclient.discovery.build, or None without google-api-python-client."""
+    return _optional_import("googleapiclient.discovery", "build")
+
+
+def youtube_dl_class():
+    """yt_dlp.YoutubeDL, or None without yt-dlp."""
+    return _optional_import("yt_dlp", "YoutubeDL")
 
-# yt-dlp fallback (optional; helps retrieve auto-subtitles & metadata when youtube_transcript_api fails)
-try:
-    from yt_dlp import YoutubeDL
-except Exception:
-    YoutubeDL = None
 
 # ----------------- Load env -----------------
 load_dotenv()
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
+# per-stage network budget for /analyze (seconds) and size of the shared fetch pool
+STAGE_TIMEOUT = float(os.getenv("STAGE_TIMEOUT", "25"))
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "16"))
+# /analyze/batch: worker pool size (upper bound on per-request concurrency) and max URLs per request
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "8"))
+BATCH_MAX_URLS = int(os.getenv("BATCH_MAX_URLS", "5000"))
+# YouTube Data API accepts at most 50 ids per videos().list / channels().list call
+API_BATCH_SIZE = 50
+# transcript pagination: first page is inlined in /analyze, the rest is served by /transcript/<video_id>
+TRANSCRIPT_PAGE_SIZE = int(os.getenv("TRANSCRIPT_PAGE_SIZE", "200"))
+TRANSCRIPT_PAGE_MAX = int(os.getenv("TRANSCRIPT_PAGE_MAX", "2000"))
+# responses smaller than this aren't worth compressing
+COMPRESS_MIN_BYTES = 1024
+# caption language preference, most preferred first; TRANSCRIPT_TRANSLATE=0 disables
+# falling back to a YouTube-translated track
+TRANSCRIPT_LANGUAGES = [c.strip() for c in os.getenv("TRANSCRIPT_LANGUAGES", "en").split(",") if c.strip()] or ["en"]
+TRANSCRIPT_TRANSLATE = os.getenv("TRANSCRIPT_TRANSLATE", "1") != "0"
+
+# ----------------- Transcript cache -----------------
+# set TRANSCRIPT_CACHE_PATH="" to keep the cache in memory only
+transcript_cache = TranscriptCache(
+    path=os.getenv("TRANSCRIPT_CACHE_PATH", os.path.join(tempfile.gettempdir(), "yt_transcripts.sqlite3")),
+    max_items=int(os.getenv("TRANSCRIPT_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("TRANSCRIPT_CACHE_TTL", str(6 * 3600))),
+    negative_ttl=float(os.getenv("TRANSCRIPT_CACHE_NEGATIVE_TTL", str(15 * 60))),
+    dumps=Transcript.dumps,
+    loads=Transcript.loads,
+    empty=Transcript,
+)
+
+# subscriber counts change slowly and most traffic comes from a few hundred channels
+channel_stats_cache = TTLCache(
+    max_items=int(os.getenv("CHANNEL_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("CHANNEL_CACHE_TTL", str(6 * 3600))),
+)
+_NOT_CACHED = object()
+
+# video_id -> id of the caption track chosen for it (see choose_track), so refetches
+# after a transcript cache expiry skip selection and return the same track
+track_cache = TTLCache(
+    max_items=int(os.getenv("TRACK_CACHE_SIZE", "50000")),
+    ttl=float(os.getenv("TRACK_CACHE_TTL", str(7 * 24 * 3600))),
+)
+
+# ----------------- YouTube Data API client -----------------
+# One Resource for the whole process (discovery document parsed once). httplib2.Http
+# isn't thread-safe, so requests run on a per-thread Http that keeps its connections alive.
+# a failed build() (bad key, discovery fetch error) is retried at most every YT_CLIENT_RETRY seconds
+YT_CLIENT_RETRY = 60.0
+_yt_client = None
+_yt_client_retry_at = 0.0
+_yt_client_lock = threading.Lock()
+_yt_local = threading.local()
+
+
+def _thread_http():
+    http = getattr(_yt_local, "http", None)
+    if http is None:
+        import httplib2
+
+        http = _yt_local.http = httplib2.Http(timeout=STAGE_TIMEOUT)
+    return http
+
+
+def _thread_request(http, *args, **kwargs):
+    # requestBuilder hook: ignore the Resource's shared http, use this thread's
+    from googleapiclient.http import HttpRequest
+
+    return HttpRequest(_thread_http(), *args, **kwargs)
+
+
+def youtube_client():
+    """
+    Shared, thread-safe YouTube Data API v3 client; None without an API key or the
+    library, or while a failed build is backing off (metadata then goes to yt-dlp).
+    """
+    global _yt_client, _yt_client_retry_at
+    if _yt_client is None:
+        build = google_build() if YOUTUBE_API_KEY else None
+        if build is None or time.monotonic() < _yt_client_retry_at:
+            return None
+        with _yt_client_lock:
+            if _yt_client is None and time.monotonic() >= _yt_client_retry_at:
+                try:
+                    _yt_client = build(
+                        "youtube", "v3", developerKey=YOUTUBE_API_KEY,
+                        requestBuilder=_thread_request, cache_discovery=False,
+                    )
+                except Exception as e:
+                    print("DEBUG: YouTube Data API client build failed:", repr(e))
+                    _yt_client_retry_at = time.monotonic() + YT_CLIENT_RETRY
+    return _yt_client
+
+
+def channel_subscribers(yt, channel_ids):
+    """
+    {channel_id: subscriberCount or None}; served from channel_stats_cache where possible,
+    the rest fetched in one channels().list call per API_BATCH_SIZE ids.
+    """
+    out = {}
+    missing = []
+    for cid in channel_ids:
+        subs = channel_stats_cache.get(cid, _NOT_CACHED)
+        if subs is _NOT_CACHED:
+            missing.append(cid)
+        else:
+            out[cid] = subs
+    for i in range(0, len(missing), API_BATCH_SIZE):
+        chunk = missing[i:i + API_BATCH_SIZE]
+        cresp = yt.channels().list(part="statistics", id=",".join(chunk)).execute()
+        for c in cresp.get("items") or []:
+            out[c.get("id")] = c.get("statistics", {}).get("subscriberCount")
+        for cid in chunk:
+            # hidden subscriber counts are cached as None too
+            out.setdefault(cid, None)
+            channel_stats_cache.put(cid, out[cid])
+    return out
+
+
+# ----------------- Transcript search index -----------------
+# every transcript fetched upstream is indexed (FTS5) for /search; writes go through one
+# background thread so indexing never adds to request latency
+transcript_index = TranscriptIndex(
+    os.getenv("TRANSCRIPT_INDEX_PATH", os.path.join(tempfile.gettempdir(), "yt_transcript_index.sqlite3"))
+)
+index_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="index")
+SEARCH_MAX_RESULTS = 100
+
+
+def index_transcript(video_id, transcript):
+    def run():
+        try:
+            with metrics.timer("index"):
+                transcript_index.add(video_id, transcript)
+        except Exception as e:
+            print("DEBUG: transcript index error:", repr(e))
+
+    index_pool.submit(run)
+
+
+# ----------------- Request coalescing -----------------
+# one upstream fetch in flight per video_id; concurrent callers share its result/error
+transcript_flight = SingleFlight()
+metadata_flight = SingleFlight()
+
+# ----------------- Backend routing -----------------
+# youtube_transcript_api answers about the video itself, not the backend's health
+TRANSCRIPT_NONE_ERRORS = (TranscriptsDisabled, NoTranscriptFound, NoTranscriptAvailable)
+VIDEO_GONE_ERRORS = (VideoUnavailable, InvalidVideoId)
+# yt-dlp's messages for private / removed / unavailable videos
+_YTDLP_GONE_RE = re.compile(
+    r"private video|video is private|video unavailable|video has been removed|no longer available"
+    r"|account associated with this video has been terminated|incomplete youtube id|not a valid url",
+    re.I,
+)
+
+
+def _error_chain(e):
+    """e plus the exceptions it wraps (__cause__/__context__, yt-dlp's exc_info/cause)."""
+    seen = []
+    while isinstance(e, BaseException) and e not in seen and len(seen) < 8:
+        seen.append(e)
+        wrapped = getattr(e, "exc_info", None)
+        # (youtube_transcript_api's .cause is a message string, hence the isinstance checks)
+        candidates = (
+            wrapped[1] if isinstance(wrapped, tuple) and len(wrapped) > 1 else None,
+            getattr(e, "cause", None), e.__cause__, e.__context__,
+        )
+        e = next((c for c in candidates if isinstance(c, BaseException)), None)
+    return seen
+
+
+_OPTIONAL_FAULTS = (
+    ("googleapiclient.errors", "HttpError"),
+    ("httplib2", "HttpLib2Error"),
+    ("yt_dlp.networking.exceptions", "RequestError"),
+)
+
+
+def is_backend_fault(e) -> bool:
+    """
+    True for errors that say the backend is unhealthy - transport failures, rate
+    limits (TooManyRequests / 429) and Data API quota/key errors. Only these count
+    against its circuit breaker; per-video answers and anything else don't.
+    """
+    fault_types = [OSError, TooManyRequests, YouTubeRequestFailed]
+    # an exception from an optional backend means its module is already loaded;
+    # never import one here (this runs on every failed call)
+    for module, attr in _OPTIONAL_FAULTS:
+        cls = getattr(sys.modules.get(module), attr, None)
+        if cls is not None:
+            fault_types.append(cls)
+    return any(isinstance(x, tuple(fault_types)) for x in _error_chain(e))
+
+
+def ytdlp_video_gone(e) -> bool:
+    """yt-dlp DownloadError for a private, removed or invalid video (a definite per-video answer)."""
+    DownloadError = _optional_import("yt_dlp.utils", "DownloadError")
+    if DownloadError is None or not isinstance(e, DownloadError) or is_backend_fault(e):
+        return False
+    return bool(_YTDLP_GONE_RE.search(str(e)))
+
+
+# per-backend circuit breakers: a backend failing BREAKER_FAILURES times in a row (or whose
+# error EWMA reaches BREAKER_ERROR_RATE) is skipped for BREAKER_COOLDOWN seconds, then probed
+_breaker_opts = {
+    "failures": int(os.getenv("BREAKER_FAILURES", "3")),
+    "error_rate": float(os.getenv("BREAKER_ERROR_RATE", "0.5")),
+    "cooldown": float(os.getenv("BREAKER_COOLDOWN", "30")),
+}
+transcript_router = Router(
+    ["api", "yt-dlp"],
+    observer=lambda backend, ok, secs: metrics.record("transcript", secs, backend, "ok" if ok else "error"),
+    is_fault=is_backend_fault,
+    **_breaker_opts,
+)
+metadata_router = Router(
+    ["data-api", "yt-dlp"],
+    observer=lambda backend, ok, secs: metrics.record("metadata", secs, backend, "ok" if ok else "error"),
+    is_fault=is_backend_fault,
+    **_breaker_opts,
+)
+
 # ----------------- Flask -----------------
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 
+@app.before_request
+def start_timing():
+    request.environ["metrics.token"] = metrics.begin()
+
+
+@app.after_request
+def add_server_timing(resp):
+    # stage durations recorded while serving this request (streamed bodies: setup only)
+    timing = metrics.end(
+        request.environ.pop("metrics.token", None), request.endpoint or "unknown", str(resp.status_code)
+    )
+    if timing:
+        resp.headers["Server-Timing"] = timing
+    return resp
+
+
 @app.after_request
 def add_cors_headers(resp):
     resp.headers["Access-Control-Allow-Origin"] = "*"
-    resp.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+    resp.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, If-None-Match"
+    resp.headers["Access-Control-Expose-Headers"] = "ETag, Server-Timing"
     resp.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
     return resp
 
@@ -79,145 +370,211 @@ def safe_int(x):
         return None
 
 
-# small helper to parse VTT time like "00:01:23.456" or "01:23.456"
-def _vtt_time_to_seconds(ts: str) -> float:
-    ts = ts.strip()
-    parts = ts.split(":")
-    try:
-        if len(parts) == 3:
-            h = int(parts[0])
-            m = int(parts[1])
-            s = float(parts[2].replace(",", "."))
-        elif len(parts) == 2:
-            h = 0
-            m = int(parts[0])
-            s = float(parts[1].replace(",", "."))
-        else:
-            return float(ts)
-        return h * 3600 + m * 60 + s
-    except Exception:
+# ----------------- Transcript (robust) -----------------
+def fetch_transcript_list(video_id: str):
+    """
+    Return (transcript, error_message_or_None).
+    transcript is a compact transcript.Transcript (iterates as (start, text));
+    call .to_items() for the [{start: float, text: str}, ...] JSON shape.
+    Served from transcript_cache when possible; otherwise fetched upstream and cached.
+    "No transcript" answers (TranscriptsDisabled / NoTranscriptFound / NoTranscriptAvailable
+    with no yt-dlp captions either, or a private / removed / invalid video) are cached
+    separately with the shorter negative TTL.
+    """
+    t0 = time.monotonic()
+    cached = transcript_cache.get(video_id)
+    if cached is not None:
+        metrics.record("transcript", time.monotonic() - t0, "cache", "ok" if cached[0] else "negative")
+        return cached
+    return transcript_flight.do(video_id, _load_transcript, video_id)
+
+
+def _load_transcript(video_id: str):
+    """Fetch upstream and populate transcript_cache (runs once per in-flight video_id)."""
+    items, err, no_transcript = _fetch_transcript_upstream(video_id)
+    if items:
+        transcript_cache.put(video_id, items, err)
+        index_transcript(video_id, items)
+    elif no_transcript:
+        transcript_cache.put_negative(video_id, err)
+    return items, err
+
+
+def _fetch_transcript_upstream(video_id: str):
+    """
+    Return (Transcript, error_message_or_None, no_transcript).
+    Two backends, tried in the order transcript_router picks (healthy + fastest first):
+      - "api":    youtube_transcript_api track listing + fetch of the best track (normally fast)
+      - "yt-dlp": download the VTT (auto-)subtitle track and parse it
+    A backend whose circuit breaker is open is skipped until its cooldown ends.
+    no_transcript is True only when the API reported the video has no transcript
+    and yt-dlp found none either, or a backend reported the video private, removed
+    or invalid (safe to negative-cache).
+    """
+    api_none = False   # API answered "this video has no transcript"
+    unsure = False     # a backend failed or was skipped, so "none" isn't definitive
+    err_msg = ""
+    tried = set()
+    for backend in transcript_router.order():
+        tried.add(backend)
+        if backend == "api":
+            try:
+                items = transcript_router.call(
+                    "api", _transcript_via_api, video_id, ok_errors=TRANSCRIPT_NONE_ERRORS + VIDEO_GONE_ERRORS
+                )
+                if items:
+                    return items, None, False
+                # no entries -> try the next backend
+            except VIDEO_GONE_ERRORS as e:
+                # no backend will do better for this video
+                return Transcript(), f"{e.__class__.__name__}: {str(e)}", True
+            except TRANSCRIPT_NONE_ERRORS as e:
+                err_msg = f"{e.__class__.__name__}: {str(e)}"
+                api_none = True
+            except Exception as e:
+                # unexpected error from library (e.g. older/wrong install, blocked IP)
+                err_msg = f"youtube_transcript_api error: {str(e)}"
+                unsure = True
+                print("DEBUG: youtube_transcript_api error:", repr(e))  # helpful debug in server logs
+            continue
+
+        YoutubeDL = youtube_dl_class()
+        if YoutubeDL is None:
+            # yt-dlp isn't installed
+            err_msg = f"No transcript available. Fallback not installed: install yt-dlp with `pip install -U yt-dlp` (detail: {err_msg})"
+            continue
         try:
-            return float(ts.replace(",", "."))
-        except Exception:
-            return 0.0
+            items, msg = transcript_router.call("yt-dlp", _transcript_via_ytdlp, video_id, YoutubeDL)
+            if items:
+                return items, None, False
+            err_msg = msg
+        except Exception as e2:
+            print("DEBUG: yt-dlp fallback error:", repr(e2))
+            if ytdlp_video_gone(e2):
+                return Transcript(), f"Video unavailable: {str(e2)}", True
+            err_msg = f"Transcript fetch failed: {str(e2)}"
+            unsure = True
 
+    unsure = unsure or len(tried) < len(transcript_router.names)
+    return Transcript(), err_msg or "No transcript available.", api_none and not unsure
 
-# ----------------- Transcript (robust) -----------------
-def fetch_transcript_list(video_id: str):
+
+def track_id(track, translate_to=None) -> str:
+    """Stable id of a caption track choice, e.g. "de", "de/auto", "es>en"."""
+    tid = track.language_code + ("/auto" if track.is_generated else "")
+    return f"{tid}>{translate_to}" if translate_to else tid
+
+
+def choose_track(tracks, languages=None, translate=None):
     """
-    Return (items_list, error_message_or_None).
-    items_list = [{start: float, text: str}, ...]
-    Strategy:
-      1) try youtube_transcript_api.get_transcript (fast)
-      2) on failure, if yt-dlp available -> download VTT (auto-sub) and parse
-      3) otherwise return empty & error message
+    Best (track, translate_to_or_None) among a video's listed tracks:
+      1) manual track in a preferred language (in preference order)
+      2) auto-generated track in a preferred language
+      3) a translatable track (manual first) translated to the most preferred language possible
+      4) any track as-is (manual first) - still cheaper than the yt-dlp fallback
+    (None, None) if the video has no tracks.
     """
-    # 1) Try youtube_transcript_api (preferred)
-    try:
-        data = YouTubeTranscriptApi.get_transcript(video_id, languages=["en"])
-        out = []
-        for entry in data:
-            start = float(entry.get("start", 0)) if entry.get("start") is not None else 0.0
-            text = (entry.get("text") or "").replace("\n", " ").strip()
-            if text:
-                out.append({"start": start, "text": text})
-        if out:
-            return out, None
-        # no entries -> fall through to fallback
-    except (TranscriptsDisabled, NoTranscriptFound) as e:
-        # no transcript available via API -> fall through to yt-dlp fallback
-        err_msg = f"{e.__class__.__name__}: {str(e)}"
-        # continue to fallback
-    except Exception as e:
-        # unexpected error from library (e.g. older/wrong install)
-        err_msg = f"youtube_transcript_api error: {str(e)}"
-        print("DEBUG: youtube_transcript_api error:", repr(e))  # helpful debug in server logs
+    languages = languages or TRANSCRIPT_LANGUAGES
+    translate = TRANSCRIPT_TRANSLATE if translate is None else translate
+    tracks = sorted(tracks, key=lambda t: t.is_generated)  # stable: manual first
+    for generated in (False, True):
+        for code in languages:
+            for t in tracks:
+                if t.is_generated == generated and t.language_code == code:
+                    return t, None
+    if translate:
+        for code in languages:
+            for t in tracks:
+                if any(l.get("language_code") == code for l in t.translation_languages):
+                    return t, code
+    return (tracks[0], None) if tracks else (None, None)
 
-    # 2) Fallback: try yt-dlp to download VTT subtitle and parse
-    if YoutubeDL is None:
-        # yt-dlp isn't installed
-        return [], f"No transcript available. Fallback not installed: install yt-dlp with `pip install -U yt-dlp` (detail: {err_msg if 'err_msg' in locals() else ''})"
 
-    try:
-        tmpdir = tempfile.gettempdir()
-        outtmpl = tmpdir + "/%(id)s.%(ext)s"
-        ydl_opts = {
-            "skip_download": True,
-            "writesubtitles": True,
-            "writeautomaticsub": True,
-            "subtitleslangs": ["en"],
-            "subtitlesformat": "vtt",
-            "outtmpl": outtmpl,
-            "quiet": True,
-            "no_warnings": True,
-        }
-        url = f"https://www.youtube.com/watch?v={video_id}"
-        with YoutubeDL(ydl_opts) as ydl:
-            # download will write subtitle file(s) to tmpdir if available
-            ydl.download([url])
-
-        # find the produced .vtt file(s) for this id in tmpdir
-        pattern = os.path.join(tmpdir, f"{video_id}*.vtt")
-        candidates = glob.glob(pattern)
-        vtt_path = None
-        if candidates:
-            # pick the first candidate (usually videoid.en.vtt or videoid.vtt)
-            vtt_path = candidates[0]
-
-        if not vtt_path:
-            return [], "No subtitles available via yt-dlp."
-
-        # parse VTT
-        with open(vtt_path, "r", encoding="utf-8", errors="ignore") as fh:
-            vtt_text = fh.read()
-
-        # remove header "WEBVTT" if present
-        vtt_text = re.sub(r'^\s*WEBVTT.*\n', "", vtt_text, flags=re.IGNORECASE)
-
-        # split by blank lines (simple cue separation)
-        blocks = [b.strip() for b in re.split(r'\n\s*\n', vtt_text) if b.strip()]
-        items = []
-        time_re = re.compile(
-            r'(\d{1,2}:\d{2}:\d{2}\.\d{3}|\d{1,2}:\d{2}\.\d{3}|\d{1,2}:\d{2}:\d{2}\.\d{2,3})\s*-->\s*(\d{1,2}:\d{2}:\d{2}\.\d{3}|\d{1,2}:\d{2}\.\d{3})'
+def _transcript_via_api(video_id: str):
+    # one listing call gives every track (manual, generated, translatable) for the video
+    tracks = list(YouTubeTranscriptApi.list_transcripts(video_id))
+    track, target = None, None
+    chosen = track_cache.get(video_id)
+    if chosen:
+        code, _, target = chosen.partition(">")
+        track = next((t for t in tracks if track_id(t) == code), None)
+        target = target or None
+        if track is not None and target and not any(
+            l.get("language_code") == target for l in track.translation_languages
+        ):
+            track = None
+    if track is None:
+        track, target = choose_track(tracks)
+        if track is None:
+            raise NoTranscriptFound(video_id, TRANSCRIPT_LANGUAGES, "(no caption tracks)")
+        track_cache.put(video_id, track_id(track, target))
+    data = (track.translate(target) if target else track).fetch()
+    out = TranscriptBuilder()
+    for entry in data:
+        start = float(entry.get("start", 0)) if entry.get("start") is not None else 0.0
+        text = (entry.get("text") or "").replace("\n", " ").strip()
+        out.append(start, text)
+    return out.build()
+
+
+def _transcript_via_ytdlp(video_id: str, YoutubeDL):
+    """(Transcript, message_if_empty) from yt-dlp's subtitle track; raises on yt-dlp errors."""
+    # no outtmpl / download: subtitles are streamed straight from the URL yt-dlp
+    # resolves, so nothing touches the shared tempdir and concurrent requests
+    # for the same video can't clobber each other's files
+    ydl_opts = {
+        "skip_download": True,
+        "writesubtitles": True,
+        "writeautomaticsub": True,
+        "subtitleslangs": TRANSCRIPT_LANGUAGES,
+        "subtitlesformat": "vtt",
+        "quiet": True,
+        "no_warnings": True,
+    }
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    with YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False) or {}
+        # requested_subtitles: the tracks yt-dlp picked for subtitleslangs/subtitlesformat
+        subs = info.get("requested_subtitles") or {}
+        codes = [c for c in TRANSCRIPT_LANGUAGES if c in subs] + list(subs)
+        code, track = next(
+            ((c, subs[c]) for c in codes if subs[c].get("ext") == "vtt" and (subs[c].get("data") or subs[c].get("url"))),
+            (None, None),
         )
-        for block in blocks:
-            m = time_re.search(block)
-            if not m:
-                continue
-            start_ts = m.group(1)
-            # find the text lines after the time line
-            lines = block.splitlines()
-            # find the index of time line
-            text_lines = []
-            for i, line in enumerate(lines):
-                if time_re.search(line):
-                    text_lines = lines[i + 1:]
-                    break
-            if not text_lines:
-                # sometimes the block is just time + text on same lines after blank; try other approach
-                parts = block.split("\n")
-                text_lines = [p for p in parts if not time_re.search(p)]
-            caption_text = " ".join([l.strip() for l in text_lines]).strip()
-            if not caption_text:
-                continue
-            try:
-                start_sec = _vtt_time_to_seconds(start_ts)
-            except Exception:
-                start_sec = 0.0
-            items.append({"start": start_sec, "text": caption_text})
-        # cleanup downloaded VTT files for this id
-        for p in candidates:
-            try:
-                os.remove(p)
-            except Exception:
-                pass
+        if track is None:
+            return Transcript(), "No subtitles available via yt-dlp."
+        # yt-dlp prefers a manual track ("subtitles") over the auto one for the same language;
+        # only auto-captions roll
+        rolling = code not in (info.get("subtitles") or {})
 
-        if items:
-            return items, None
-        return [], "No captions parsed from VTT."
-    except Exception as e2:
-        print("DEBUG: yt-dlp fallback error:", repr(e2))
-        return [], f"Transcript fetch failed: {str(e2)}"
+        # parse VTT line by line (rolling auto-caption repeats collapsed)
+        if track.get("data"):
+            items = Transcript.from_pairs(iter_vtt_cues(track["data"].splitlines(True), collapse_rolling=rolling))
+        else:
+            # ydl.urlopen reuses this YoutubeDL's HTTP session (same connection pool as extract_info)
+            with ydl.urlopen(track["url"]) as resp:
+                items = Transcript.from_pairs(iter_vtt_cues(_response_lines(resp), collapse_rolling=rolling))
+    return items, "No captions parsed from VTT."
+
+
+def _response_lines(resp, chunk_size=1 << 16):
+    """
+    Decoded lines from an HTTP response, read in chunks. The response closes
+    itself once the body is consumed, so io.TextIOWrapper (which checks
+    `closed` on every read) can't wrap it.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    tail = ""
+    while True:
+        chunk = resp.read(chunk_size)
+        text = tail + decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            if text:
+                yield text
+            return
+        lines = text.splitlines(True)
+        tail = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        yield from lines
 
 
 # ----------------- Metadata (YouTube Data API with fallback) -----------------
@@ -225,82 +582,201 @@ def fetch_video_metadata_using_api(video_id: str):
     """
     Primary: use YouTube Data API v3 (requires YOUTUBE_API_KEY).
     Fallback: if Google API not available or fails, try yt-dlp extract_info.
+    Concurrent calls for the same video share a single upstream fetch.
     """
-    # Try Google API first (if available)
-    if YOUTUBE_API_KEY and build is not None:
-        try:
-            yt = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
-            vresp = yt.videos().list(part="snippet,statistics", id=video_id).execute()
-            if vresp.get("items"):
-                v = vresp["items"][0]
-                snip = v.get("snippet", {})
-                stats = v.get("statistics", {})
-                channel_title = snip.get("channelTitle")
-                channel_id = snip.get("channelId")
-                subs = None
-                if channel_id:
-                    cresp = yt.channels().list(part="statistics", id=channel_id).execute()
-                    if cresp.get("items"):
-                        subs = cresp["items"][0]["statistics"].get("subscriberCount")
-                return {
-                    "title": snip.get("title"),
-                    "channel": channel_title,
-                    "views": safe_int(stats.get("viewCount")),
-                    "likes": safe_int(stats.get("likeCount")),
-                    "comments": safe_int(stats.get("commentCount")),
-                    "subscribers": safe_int(subs) if subs is not None else None,
-                }
-        except Exception as e:
-            print("DEBUG: YouTube Data API error:", repr(e))
-            # fallthrough to yt-dlp fallback
+    return metadata_flight.do(video_id, _fetch_video_metadata_upstream, video_id)
+
 
-    # Fallback to yt-dlp (if available)
-    if YoutubeDL is not None:
+def _fetch_video_metadata_upstream(video_id: str):
+    # Data API first (subscriber counts) unless its breaker is open or yt-dlp is faster
+    err = "Missing YOUTUBE_API_KEY and yt-dlp not installed"
+    for backend in metadata_router.order():
+        if backend == "data-api":
+            yt = youtube_client()
+            if yt is None:
+                continue
+            try:
+                meta = metadata_router.call("data-api", _metadata_via_api, yt, video_id)
+                if meta is not None:
+                    return meta
+            except Exception as e:
+                print("DEBUG: YouTube Data API error:", repr(e))
+                # fallthrough to the next backend
+            continue
+
+        YoutubeDL = youtube_dl_class()
+        if YoutubeDL is None:
+            continue
         try:
-            ydl_opts = {"skip_download": True, "quiet": True}
-            with YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False) or {}
-            return {
-                "title": info.get("title"),
-                "channel": info.get("uploader") or info.get("channel"),
-                "views": safe_int(info.get("view_count")),
-                "likes": safe_int(info.get("like_count")),
-                "comments": safe_int(info.get("comment_count")),
-                "subscribers": None,
-            }
+            return metadata_router.call("yt-dlp", _metadata_via_ytdlp, video_id, YoutubeDL)
         except Exception as e:
             print("DEBUG: yt-dlp metadata error:", repr(e))
-            return {"error": f"Metadata fetch failed: {str(e)}"}
+            err = f"Metadata fetch failed: {str(e)}"
+    return {"error": err}
+
+
+def _metadata_via_api(yt, video_id: str):
+    """Metadata dict from the Data API, or None if it doesn't know the video."""
+    vresp = yt.videos().list(part="snippet,statistics", id=video_id).execute()
+    if not vresp.get("items"):
+        return None
+    v = vresp["items"][0]
+    channel_id = v.get("snippet", {}).get("channelId")
+    subs = channel_subscribers(yt, [channel_id]).get(channel_id) if channel_id else None
+    return _meta_from_api_item(v, subs)
+
+
+def _metadata_via_ytdlp(video_id: str, YoutubeDL):
+    ydl_opts = {"skip_download": True, "quiet": True}
+    with YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False) or {}
+    return {
+        "title": info.get("title"),
+        "channel": info.get("uploader") or info.get("channel"),
+        "views": safe_int(info.get("view_count")),
+        "likes": safe_int(info.get("like_count")),
+        "comments": safe_int(info.get("comment_count")),
+        "subscribers": None,
+    }
+
+
+def _meta_from_api_item(v, subs):
+    """Shape a videos().list item (+ channel subscriberCount) into our metadata dict."""
+    snip = v.get("snippet", {})
+    stats = v.get("statistics", {})
+    return {
+        "title": snip.get("title"),
+        "channel": snip.get("channelTitle"),
+        "views": safe_int(stats.get("viewCount")),
+        "likes": safe_int(stats.get("likeCount")),
+        "comments": safe_int(stats.get("commentCount")),
+        "subscribers": safe_int(subs) if subs is not None else None,
+    }
+
+
+def fetch_video_metadata_batch(video_ids):
+    """
+    Metadata for many videos via the Data API: {video_id: meta_dict}.
+    One videos().list call per API_BATCH_SIZE ids, plus channels().list for channels not cached.
+    Ids the API didn't return are simply absent - callers fall back to
+    fetch_video_metadata_using_api for those.
+    """
+    out = {}
+    yt = youtube_client() if video_ids else None
+    # tripped breaker: leave everything to the per-video path (which routes to yt-dlp)
+    if yt is None or not metadata_router.breakers["data-api"].allow():
+        return out
+    try:
+        for i in range(0, len(video_ids), API_BATCH_SIZE):
+            chunk = video_ids[i:i + API_BATCH_SIZE]
+            out.update(metadata_router.call("data-api", _metadata_batch_via_api, yt, chunk))
+    except Exception as e:
+        print("DEBUG: YouTube Data API batch error:", repr(e))
+    return out
 
-    return {"error": "Missing YOUTUBE_API_KEY and yt-dlp not installed"}
+
+def _metadata_batch_via_api(yt, chunk):
+    vresp = yt.videos().list(part="snippet,statistics", id=",".join(chunk)).execute()
+    items = vresp.get("items") or []
+    channel_ids = sorted({v.get("snippet", {}).get("channelId") for v in items} - {None})
+    subs_by_channel = channel_subscribers(yt, channel_ids)
+    out = {}
+    for v in items:
+        channel_id = v.get("snippet", {}).get("channelId")
+        out[v.get("id")] = _meta_from_api_item(v, subs_by_channel.get(channel_id))
+    return out
 
 
 # ----------------- NEW FACT-CHECKING LOGIC -----------------
-def get_fact_check_verdict(transcript_text):
+# lexicon is loaded once at startup (FACT_CHECK_LEXICON=path/to/lexicon.json, else built-in keywords)
+verdict_engine = VerdictEngine(load_lexicon(os.getenv("FACT_CHECK_LEXICON")))
+
+
+def get_fact_check_verdict(transcript_items):
     """
-    Analyzes the transcript for keywords to determine a simple fact-check verdict.
+    Scans the transcript (a Transcript, [{start, text}, ...] items or a plain string) for
+    lexicon phrases in a single pass and returns {"verdict": "False"|"True"|"Verify", "evidence": [...]},
+    each evidence entry carrying the matched phrase and the `start` of the caption it began in.
     """
-    transcript_lower = transcript_text.lower()
+    if isinstance(transcript_items, str):
+        transcript_items = [(0.0, transcript_items)]
+    elif isinstance(transcript_items, list):
+        transcript_items = ((it.get("start", 0.0), it.get("text")) for it in transcript_items)
+    return verdict_engine.check(transcript_items)
+
 
-    # Check for keywords that might indicate misinformation or a disclaimer
-    keywords_false = ["conspiracy theory", "false claim", "debunked", "hoax", "not true"]
-    for keyword in keywords_false:
-        if keyword in transcript_lower:
-            return "False"
+# per-(video, window size) incremental scorers: re-analysing a growing live transcript only
+# scans the captions added since the last time (see verdict_engine.WindowedVerdict)
+VERDICT_WINDOW_MIN = 5
+VERDICT_WINDOW_MAX = 6 * 3600
+# every match is counted in window/step windows, so overlap is bounded too
+VERDICT_WINDOW_OVERLAP_MAX = 60
+windowed_scorers = TTLCache(
+    max_items=int(os.getenv("VERDICT_WINDOW_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("VERDICT_WINDOW_CACHE_TTL", str(6 * 3600))),
+)
+_scorers_lock = threading.Lock()
 
-    # Check for keywords that might indicate a scientific or factual basis
-    keywords_true = ["peer-reviewed study", "scientific evidence", "data shows", "verifiable"]
-    for keyword in keywords_true:
-        if keyword in transcript_lower:
-            return "True"
 
-    # If no strong keywords are found, default to "Verify"
-    return "Verify"
+def get_windowed_verdict(video_id, transcript, window, step=None):
+    """
+    {"window", "step", "timeline": [{"start", "end", "verdict", "counts", "evidence"}, ...],
+     "aggregate": {"verdict", "matches", "windows", "captions", "evidence"}, "updated": [...]} for a Transcript;
+    the aggregate verdict/evidence equal get_fact_check_verdict's for the same transcript.
+    step (default: window) < window gives overlapping sliding windows.
+    """
+    window = max(float(window), VERDICT_WINDOW_MIN)
+    step = min(max(float(step), VERDICT_WINDOW_MIN), window) if step else window
+    key = (video_id, window, step)
+    with _scorers_lock:
+        scorer = windowed_scorers.get(key)
+        if scorer is None:
+            scorer = WindowedVerdict(verdict_engine, window=window, step=step)
+            windowed_scorers.put(key, scorer)
+    return scorer.update(transcript)
 
 
 # ----------------- END OF NEW FACT-CHECKING LOGIC -----------------
 
 
+# ----------------- Concurrent fetch stages -----------------
+# shared, bounded pool so a burst of requests can't spawn unbounded threads
+fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fetch")
+
+
+def _stage_result(future, deadline, fallback, label):
+    """
+    Wait for a stage future until deadline (time.monotonic()); on timeout/error
+    return fallback(msg) so the other stage's result can still be served.
+    """
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FutureTimeout:
+        print(f"DEBUG: {label} stage timed out after {STAGE_TIMEOUT}s")
+        return fallback(f"{label} fetch timed out after {STAGE_TIMEOUT:g}s")
+    except Exception as e:
+        print(f"DEBUG: {label} stage error:", repr(e))
+        return fallback(f"{label} fetch failed: {str(e)}")
+
+
+def fetch_video_stages(video_id: str):
+    """
+    Run transcript and metadata fetches in parallel on fetch_pool.
+    Returns ((transcript, transcript_err), meta) - same shapes as the
+    individual fetchers, with errors folded in instead of raised.
+    """
+    deadline = time.monotonic() + STAGE_TIMEOUT
+    # run in copies of the caller's context so stage timings reach its Server-Timing header
+    # (and the slow-request profiler credits these pool threads to the request)
+    t_future = fetch_pool.submit(contextvars.copy_context().run, metrics.run_for_request, fetch_transcript_list, video_id)
+    m_future = fetch_pool.submit(
+        contextvars.copy_context().run, metrics.run_for_request, fetch_video_metadata_using_api, video_id
+    )
+    transcript = _stage_result(t_future, deadline, lambda msg: (Transcript(), msg), "Transcript")
+    meta = _stage_result(m_future, deadline, lambda msg: {"error": msg}, "Metadata")
+    return transcript, meta
+
+
 # ----------------- Routes -----------------
 @app.route("/analyze", methods=["POST", "OPTIONS"])
 def analyze():
@@ -317,42 +793,490 @@ def analyze():
         if not video_id:
             return jsonify({"error": "Invalid YouTube URL"}), 200
 
-        # 1) transcript as list for your UI
-        transcript_items, transcript_err = fetch_transcript_list(video_id)
-
-        # 2) stats via YouTube API (or yt-dlp fallback)
-        meta = fetch_video_metadata_using_api(video_id)
-
-        # ----------------- NEW: Join transcript for analysis -----------------
-        transcript_text = " ".join([item['text'] for item in transcript_items])
-
-        # ----------------- NEW: Call the fact-check function -----------------
-        verdict = get_fact_check_verdict(transcript_text)
-        # ----------------- END OF NEW CODE -----------------
-
-        # Build response that matches your frontend expectations
-        resp = {
-            "ok": True,
-            "video_id": video_id,
-            "transcript": transcript_items[:200],  # cap for speed
-            "transcript_error": transcript_err,
-            "fact_check": verdict,  # ----------------- NEW: Use the verdict variable -----------------
-            "video_info": {
-                "channel": meta.get("channel"),
-                "views": meta.get("views"),
-                "likes": meta.get("likes"),
-                "subscribers": meta.get("subscribers"),
-                "comments": meta.get("comments"),
-            },
-        }
-        return jsonify(resp), 200
+        try:
+            window, step = _window_params(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 200
+
+        return jsonify(analyze_video(
+            video_id, claims=bool(data.get("claims")), window=window, step=step, refresh=bool(data.get("refresh"))
+        )), 200
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 200
 
 
+def _seconds_param(data, name):
+    value = data.get(name)
+    try:
+        seconds = float(value) if not isinstance(value, bool) else math.nan
+    except (TypeError, ValueError):
+        seconds = math.nan
+    if not math.isfinite(seconds) or seconds <= 0:
+        raise ValueError(f'"{name}" must be a positive number of seconds')
+    return seconds
+
+
+def _window_params(data):
+    """
+    Request body "window" (seconds, or true for 60) and "step" (seconds, default window)
+    -> (window, step); (None, None) without a window (no per-window timeline).
+    Raises ValueError for values that aren't usable.
+    """
+    if not data.get("window"):
+        return None, None
+    window = 60.0 if data["window"] is True else _seconds_param(data, "window")
+    if window > VERDICT_WINDOW_MAX:
+        raise ValueError(f'"window" must be at most {VERDICT_WINDOW_MAX} seconds')
+    window = max(window, VERDICT_WINDOW_MIN)
+    if not data.get("step"):
+        return window, None
+    step = max(_seconds_param(data, "step"), VERDICT_WINDOW_MIN)
+    if step > window:
+        raise ValueError('"step" must not be larger than "window"')
+    if window / step > VERDICT_WINDOW_OVERLAP_MAX:
+        raise ValueError(f'"step" must be at least 1/{VERDICT_WINDOW_OVERLAP_MAX} of "window"')
+    return window, step
+
+
+def analyze_video(video_id, claims=False, progress=None, window=None, step=None, refresh=False):
+    """
+    Full /analyze payload for one video; progress(stage, fraction) is called between stages.
+    window (seconds) adds "fact_check_windows": a per-window verdict timeline + aggregate,
+    with windows every step seconds (default: window).
+    refresh drops the cached transcript first, e.g. to pick up new captions of a live stream.
+    """
+    progress = progress or (lambda stage, fraction: None)
+    if refresh:
+        transcript_cache.invalidate(video_id)
+
+    # 1) transcript as list for your UI + 2) stats via YouTube API (or yt-dlp fallback),
+    # fetched concurrently; a slow/failed stage doesn't block the other
+    progress("fetch", 0.0)
+    (transcript_items, transcript_err), meta = fetch_video_stages(video_id)
+
+    progress("verdict", 0.5)
+    if window and transcript_items:
+        # the windowed scorer's aggregate is the whole-transcript verdict: no second full scan
+        with metrics.timer("verdict_windows"):
+            windows = get_windowed_verdict(video_id, transcript_items, window, step)
+        verdict = {"verdict": windows["aggregate"]["verdict"], "evidence": windows["aggregate"]["evidence"]}
+        resp = build_analysis(video_id, transcript_items, transcript_err, meta, verdict=verdict)
+        resp["fact_check_windows"] = windows
+    else:
+        resp = build_analysis(video_id, transcript_items, transcript_err, meta)
+
+    # opt-in LLM stage: windowed claim extraction + verification via the agents
+    if claims and transcript_items:
+        progress("claims", 0.6)
+        try:
+            with metrics.timer("claims"):
+                resp["claims"] = run_claim_pipeline(transcript_items)
+        except Exception as e:
+            print("DEBUG: claim pipeline error:", repr(e))
+            resp["claims_error"] = f"Claim pipeline failed: {str(e)}"
+    return resp
+
+
+def build_analysis(video_id, transcript_items, transcript_err, meta, verdict=None):
+    """
+    Verdict + response payload shared by /analyze and /analyze/batch.
+    verdict: an already computed {"verdict", "evidence"} for transcript_items (skips the scan).
+    """
+    # ----------------- NEW: Call the fact-check function -----------------
+    if verdict is None:
+        with metrics.timer("verdict"):
+            verdict = get_fact_check_verdict(transcript_items)
+    # ----------------- END OF NEW CODE -----------------
+
+    # Build response that matches your frontend expectations
+    return {
+        "ok": True,
+        "video_id": video_id,
+        # first page only; the rest is paged in from /transcript/<video_id>
+        "transcript": transcript_items[:TRANSCRIPT_PAGE_SIZE].to_items(),
+        "transcript_total": len(transcript_items),
+        "transcript_next_offset": TRANSCRIPT_PAGE_SIZE if len(transcript_items) > TRANSCRIPT_PAGE_SIZE else None,
+        "transcript_error": transcript_err,
+        "fact_check": verdict["verdict"],  # ----------------- NEW: Use the verdict variable -----------------
+        "fact_check_evidence": verdict["evidence"],
+        "video_info": _video_info(meta),
+        "metadata_error": meta.get("error"),
+    }
+
+
+def _video_info(meta):
+    return {
+        "channel": meta.get("channel"),
+        "views": meta.get("views"),
+        "likes": meta.get("likes"),
+        "subscribers": meta.get("subscribers"),
+        "comments": meta.get("comments"),
+    }
+
+
+# shared pool for /analyze/batch work; each request is further limited by its own concurrency
+batch_pool = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="batch")
+
+
+@app.route("/analyze/batch", methods=["POST", "OPTIONS"])
+def analyze_batch():
+    """
+    Body: {"urls": [url_or_id, ...], "concurrency": optional int <= BATCH_WORKERS}
+    Streams one JSON object per line (NDJSON) as each video finishes, in completion order.
+    Invalid URLs are reported first as {"ok": false, "input": ..., "error": ...}.
+    """
+    if request.method == "OPTIONS":
+        return ("", 204)
+
+    data = request.get_json(force=True, silent=True) or {}
+    urls = data.get("urls") or data.get("ids") or []
+    if not isinstance(urls, list) or not urls:
+        return jsonify({"error": "No URLs provided"}), 200
+    if len(urls) > BATCH_MAX_URLS:
+        return jsonify({"error": f"Too many URLs (max {BATCH_MAX_URLS})"}), 200
+    concurrency = max(1, min(safe_int(data.get("concurrency")) or BATCH_WORKERS, BATCH_WORKERS))
+
+    invalid = []
+    video_ids = []
+    seen = set()
+    for u in urls:
+        vid = extract_video_id(u if isinstance(u, str) else "")
+        if not vid:
+            invalid.append(u)
+        elif vid not in seen:
+            seen.add(vid)
+            video_ids.append(vid)
+
+    # with an API key, metadata is fetched in API_BATCH_SIZE chunks alongside the transcript work
+    meta_futures = {}
+    if youtube_client() is not None:
+        for i in range(0, len(video_ids), API_BATCH_SIZE):
+            chunk = video_ids[i:i + API_BATCH_SIZE]
+            fut = fetch_pool.submit(fetch_video_metadata_batch, chunk)
+            for vid in chunk:
+                meta_futures[vid] = fut
+
+    def analyze_one(video_id):
+        if video_id not in meta_futures:
+            (transcript_items, transcript_err), meta = fetch_video_stages(video_id)
+            return build_analysis(video_id, transcript_items, transcript_err, meta)
+        deadline = time.monotonic() + STAGE_TIMEOUT
+        t_future = fetch_pool.submit(fetch_transcript_list, video_id)
+        meta = _stage_result(meta_futures[video_id], deadline, lambda msg: {}, "Metadata").get(video_id)
+        if meta is None:
+            # the batch call didn't return this id -> per-video fallback
+            meta = _stage_result(
+                fetch_pool.submit(fetch_video_metadata_using_api, video_id), deadline, lambda msg: {"error": msg}, "Metadata"
+            )
+        transcript_items, transcript_err = _stage_result(t_future, deadline, lambda msg: (Transcript(), msg), "Transcript")
+        return build_analysis(video_id, transcript_items, transcript_err, meta)
+
+    def generate():
+        for u in invalid:
+            yield json.dumps({"ok": False, "input": u, "error": "Invalid YouTube URL"}) + "\n"
+
+        pending = {}
+        queue = iter(video_ids)
+        for vid in queue:
+            pending[batch_pool.submit(analyze_one, vid)] = vid
+            if len(pending) >= concurrency:
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                vid = pending.pop(fut)
+                try:
+                    line = fut.result()
+                except Exception as e:
+                    line = {"ok": False, "video_id": vid, "error": f"Server error: {str(e)}"}
+                yield json.dumps(line) + "\n"
+                nxt = next(queue, None)
+                if nxt is not None:
+                    pending[batch_pool.submit(analyze_one, nxt)] = nxt
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
+@app.route("/analyze/stream", methods=["GET", "POST", "OPTIONS"])
+def analyze_stream():
+    """
+    Server-Sent Events variant of /analyze (GET ?url=... for EventSource, or POST {"url": ...}).
+    Events, each as soon as its stage finishes:
+      video_id   {"video_id"}
+      metadata   {"video_info", "metadata_error"}
+      transcript {"offset", "items", "total", "next_offset"}   (first page; the rest via /transcript/<video_id>)
+      verdict    {"fact_check", "fact_check_evidence", "transcript_error"}
+      done       {} / error {"error"}
+    """
+    if request.method == "OPTIONS":
+        return ("", 204)
+
+    if request.method == "POST":
+        url = ((request.get_json(force=True, silent=True) or {}).get("url") or "").strip()
+    else:
+        url = (request.args.get("url") or "").strip()
+    video_id = extract_video_id(url) if url else None
+
+    def event(name, payload):
+        return f"event: {name}\ndata: {json.dumps(payload)}\n\n"
+
+    def generate():
+        if not url:
+            yield event("error", {"error": "No URL provided"})
+            return
+        if not video_id:
+            yield event("error", {"error": "Invalid YouTube URL"})
+            return
+        yield event("video_id", {"video_id": video_id})
+        deadline = time.monotonic() + STAGE_TIMEOUT
+
+        def metadata_events(fut):
+            meta = _stage_result(fut, deadline, lambda msg: {"error": msg}, "Metadata")
+            yield event("metadata", {"video_info": _video_info(meta), "metadata_error": meta.get("error")})
+
+        def transcript_events(fut):
+            transcript_items, transcript_err = _stage_result(fut, deadline, lambda msg: (Transcript(), msg), "Transcript")
+            total = len(transcript_items)
+            if total:
+                yield event("transcript", {
+                    "offset": 0,
+                    "items": transcript_items[:TRANSCRIPT_PAGE_SIZE].to_items(),
+                    "total": total,
+                    "next_offset": TRANSCRIPT_PAGE_SIZE if total > TRANSCRIPT_PAGE_SIZE else None,
+                })
+            verdict = get_fact_check_verdict(transcript_items)
+            yield event("verdict", {
+                "fact_check": verdict["verdict"],
+                "fact_check_evidence": verdict["evidence"],
+                "transcript_error": transcript_err,
+            })
+
+        try:
+            pending = {
+                fetch_pool.submit(fetch_transcript_list, video_id): transcript_events,
+                fetch_pool.submit(fetch_video_metadata_using_api, video_id): metadata_events,
+            }
+            try:
+                for fut in as_completed(list(pending), timeout=max(0.0, deadline - time.monotonic())):
+                    yield from pending.pop(fut)(fut)
+            except FutureTimeout:
+                pass
+            # stages still running past the deadline are reported as timed out
+            for fut, emit in pending.items():
+                yield from emit(fut)
+            yield event("done", {})
+        except Exception as e:
+            yield event("error", {"error": f"Server error: {str(e)}"})
+
+    resp = Response(generate(), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+    return resp
+
+
+@app.route("/transcript/<video_id>", methods=["GET", "OPTIONS"])
+def transcript_page(video_id):
+    """
+    Paged transcript: ?offset=&limit= (caption indexes) and/or ?start=&end= (seconds;
+    offset/limit then apply within that time window).
+    Served with a content ETag (304 on If-None-Match) and gzip/brotli compression.
+    """
+    if request.method == "OPTIONS":
+        return ("", 204)
+    if not ID_RE.fullmatch(video_id or ""):
+        return jsonify({"error": "Invalid YouTube video id"}), 200
+
+    transcript_items, transcript_err = fetch_transcript_list(video_id)
+    view = transcript_items
+    start = request.args.get("start", type=float)
+    end = request.args.get("end", type=float)
+    if start is not None or end is not None:
+        view = view.window(start if start is not None else 0.0, end if end is not None else float("inf"))
+    offset = max(0, request.args.get("offset", 0, type=int))
+    limit = max(1, min(request.args.get("limit", TRANSCRIPT_PAGE_SIZE, type=int), TRANSCRIPT_PAGE_MAX))
+    page = view[offset:offset + limit]
+
+    # ETag covers the page content and its position, so it changes whenever the payload would
+    etag = f"{page.digest()}-{len(view)}-{offset}"
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+        resp.set_etag(etag, weak=True)
+        return resp
+
+    payload = {
+        "ok": True,
+        "video_id": video_id,
+        "total": len(view),
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + len(page) if offset + len(page) < len(view) else None,
+        "items": page.to_items(),
+        "transcript_error": transcript_err,
+    }
+    resp = _compressed_json(payload)
+    resp.set_etag(etag, weak=True)  # weak: the same page may be sent br, gzip or identity
+    resp.headers["Cache-Control"] = "no-cache"  # always revalidate; unchanged pages come back as 304
+    return resp
+
+
+# ----------------- Background jobs -----------------
+# for analyses that outlive the load balancer's request timeout: POST /jobs, then poll GET /jobs/<id>
+jobs = JobQueue(
+    path=os.getenv("JOBS_DB_PATH", os.path.join(tempfile.gettempdir(), "yt_jobs.sqlite3")),
+    handler=lambda video_id, params, progress: analyze_video(
+        video_id, params.get("claims", False), progress,
+        params.get("window"), params.get("step"), params.get("refresh", False),
+    ),
+    workers=int(os.getenv("JOB_WORKERS", "4")),
+    max_queued=int(os.getenv("JOBS_MAX_QUEUED", "1000")),
+    retention=float(os.getenv("JOBS_RETENTION", str(24 * 3600))),
+    # processes sharing JOBS_DB_PATH only take over a running job once its lease expires
+    lease=float(os.getenv("JOBS_LEASE", "60")),
+)
+
+
+@app.route("/jobs", methods=["POST", "OPTIONS"])
+def submit_job():
+    """
+    Body: {"url": ..., "claims": optional bool, "window" / "step": optional seconds, "refresh": optional bool}.
+    Returns {"ok", "job_id", "status", "attached"} at once; attached is true when the same
+    analysis was already queued or running.
+    """
+    if request.method == "OPTIONS":
+        return ("", 204)
+
+    data = request.get_json(force=True, silent=True) or {}
+    url = (data.get("url") or "").strip()
+    if not url:
+        return jsonify({"error": "No URL provided"}), 200
+    video_id = extract_video_id(url)
+    if not video_id:
+        return jsonify({"error": "Invalid YouTube URL"}), 200
+    try:
+        window, step = _window_params(data)
+        job_id, attached = jobs.submit(video_id, {
+            "claims": bool(data.get("claims")),
+            "window": window,
+            "step": step,
+            "refresh": bool(data.get("refresh")),
+        })
+    except (ValueError, QueueFull) as e:
+        return jsonify({"error": str(e)}), 200
+    job = jobs.get(job_id) or {}
+    return jsonify({"ok": True, "job_id": job_id, "status": job.get("status"), "attached": attached}), 200
+
+
+@app.route("/jobs/<job_id>", methods=["GET", "OPTIONS"])
+def job_status(job_id):
+    """{"ok", "id", "video_id", "status", "stage", "progress", ["result" | "error"]}."""
+    if request.method == "OPTIONS":
+        return ("", 204)
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id"}), 200
+    return jsonify({"ok": True, **job}), 200
+
+
+@app.route("/search", methods=["GET", "OPTIONS"])
+def search():
+    """
+    ?q=words or "a phrase" [&limit=20] [&video_id=...] over every transcript analyzed so far.
+    Hits are ranked best first: {"video_id", "start", "timestamp", "snippet", "score", "url"}.
+    """
+    if request.method == "OPTIONS":
+        return ("", 204)
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "No query provided"}), 200
+    limit = max(1, min(request.args.get("limit", 20, type=int), SEARCH_MAX_RESULTS))
+    video_id = request.args.get("video_id") or None
+    if video_id and not ID_RE.fullmatch(video_id):
+        return jsonify({"error": "Invalid YouTube video id"}), 200
+
+    t0 = time.monotonic()
+    try:
+        with metrics.timer("search"):
+            hits = transcript_index.search(q, limit=limit, video_id=video_id)
+    except Exception as e:
+        print("DEBUG: search error:", repr(e))
+        return jsonify({"error": f"Search failed: {str(e)}"}), 200
+    for h in hits:
+        s = int(h["start"])
+        h["timestamp"] = f"{s // 3600}:{s % 3600 // 60:02d}:{s % 60:02d}" if s >= 3600 else f"{s // 60:02d}:{s % 60:02d}"
+        h["url"] = f"https://www.youtube.com/watch?v={h['video_id']}&t={s}s"
+    return jsonify({
+        "ok": True,
+        "query": q,
+        "hits": hits,
+        "took_ms": round((time.monotonic() - t0) * 1000, 2),
+    }), 200
+
+
+def _compressed_json(payload):
+    """JSON response compressed per Accept-Encoding (br if available, else gzip)."""
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    resp = Response(mimetype="application/json")
+    resp.headers["Vary"] = "Accept-Encoding"
+    accepted = request.accept_encodings
+    if len(body) >= COMPRESS_MIN_BYTES:
+        if brotli is not None and accepted["br"]:
+            body = brotli.compress(body, quality=5)
+            resp.headers["Content-Encoding"] = "br"
+        elif accepted["gzip"]:
+            body = gzip.compress(body, compresslevel=6)
+            resp.headers["Content-Encoding"] = "gzip"
+    resp.set_data(body)
+    return resp
+
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Prometheus text exposition: stage histograms plus cache/breaker/job gauges."""
+    extra = {
+        "yt_cache_stat": {},
+        "yt_backend_state": {},
+        "yt_jobs": {(("state", k),): v for k, v in jobs.stats().items()},
+        "yt_coalesced_calls": {
+            (("stage", "transcript"),): transcript_flight.coalesced,
+            (("stage", "metadata"),): metadata_flight.coalesced,
+        },
+        # upstream fetches running right now (one per distinct video_id)
+        "yt_inflight_calls": {
+            (("stage", "transcript"),): transcript_flight.in_flight(),
+            (("stage", "metadata"),): metadata_flight.in_flight(),
+        },
+    }
+    for cache, stats in (("transcript", transcript_cache.stats()), ("channel", channel_stats_cache.stats()),
+                         ("track", track_cache.stats()), ("llm", llm_cache.stats())):
+        for k, v in stats.items():
+            if isinstance(v, (int, float)) and k != "hit_rate":
+                extra["yt_cache_stat"][(("cache", cache), ("stat", k))] = v
+    states = {"closed": 0, "half_open": 1, "open": 2}
+    for stage, router in (("transcript", transcript_router), ("metadata", metadata_router)):
+        for backend, st in router.stats().items():
+            extra["yt_backend_state"][(("stage", stage), ("backend", backend))] = states[st["state"]]
+    return Response(metrics.render(extra), mimetype="text/plain; version=0.0.4")
+
+
 @app.route("/health", methods=["GET"])
 def health():
-    return jsonify({"ok": True})
+    return jsonify({
+        "ok": True,
+        "transcript_cache": transcript_cache.stats(),
+        "channel_cache": channel_stats_cache.stats(),
+        "llm_cache": llm_cache.stats(),
+        "claim_index": claim_index.stats(),
+        "jobs": jobs.stats(),
+        "search_index": transcript_index.stats(),
+        "coalesced": {
+            "transcript": transcript_flight.coalesced,
+            "metadata": metadata_flight.coalesced,
+        },
+        "backends": {
+            "transcript": transcript_router.stats(),
+            "metadata": metadata_router.stats(),
+        },
+    })
 
 
 # ----------------- Run -----------------
@@ -0,0 +1,179 @@
+# benchmarks/bench_analyze.py
+"""
+End-to-end /analyze benchmark against local YouTube stand-ins (benchmarks/fakes.py),
+plus micro-benchmarks of the hot helpers.
+
+    python -m benchmarks.bench_analyze [--requests 200] [--concurrency 16]
+        [--sizes short hour] [--api-latency 0.2] [--api-fail 0.05] [--subs-url] ...
+
+Prints one JSON object per benchmark on stdout (app's DEBUG logging goes to stderr):
+  - "analyze": p50/p90/p99/max latency (ms) and throughput of POST /analyze under load
+  - "transcript_parse": building a Transcript from the API (entries) and yt-dlp (VTT) paths
+  - "extract_video_id": per-call cost over the supported URL shapes
+  - "fact_check_verdict": get_fact_check_verdict per transcript size
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# in-memory caches/stores: every run starts cold and leaves nothing behind
+for _var in ("TRANSCRIPT_CACHE_PATH", "LLM_CACHE_PATH", "CLAIM_INDEX_PATH", "JOBS_DB_PATH", "TRANSCRIPT_INDEX_PATH"):
+    os.environ.setdefault(_var, "")
+
+import app
+from benchmarks.fakes import SIZES, Backend, fake_youtube_dl, install, transcript_entries
+from transcript import Transcript
+
+URL_SHAPES = (
+    "https://www.youtube.com/watch?v={id}",
+    "https://youtu.be/{id}?t=42",
+    "https://m.youtube.com/watch?feature=share&v={id}",
+    "https://www.youtube.com/shorts/{id}",
+    "https://www.youtube.com/embed/{id}",
+    "{id}",
+)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def bench_analyze(requests, concurrency, distinct):
+    local = threading.local()
+
+    def one(i):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.app.test_client()
+        video_id = f"bench{i % distinct:06d}"
+        t0 = time.perf_counter()
+        resp = client.post("/analyze", json={"url": video_id})
+        elapsed = time.perf_counter() - t0
+        body = resp.get_json() or {}
+        ok = bool(body.get("ok")) and not body.get("transcript_error")
+        return elapsed, ok
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - t0
+    latencies = sorted(r[0] for r in results)
+
+    def ms(seconds):
+        return round(seconds * 1000, 2)
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "distinct_videos": distinct,
+        "errors": sum(1 for r in results if not r[1]),
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p90_ms": ms(percentile(latencies, 90)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1]),
+        "throughput_rps": round(requests / wall, 2),
+    }
+
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_transcript_parse(seconds, repeat, subs_url=False):
+    # zero-latency fakes: only our own parsing/building (plus local HTTP with subs_url) is timed
+    fakes = install(app, sizes=[seconds])
+    ydl_class = fake_youtube_dl(fakes["yt-dlp"], [seconds], subs_url=subs_url)
+    api_s, items = best_of(lambda: app._transcript_via_api("parse000001"), repeat)
+    vtt_s, (vtt_items, _) = best_of(lambda: app._transcript_via_ytdlp("parse000001", ydl_class), repeat)
+    return {
+        "api": {"seconds": round(api_s, 4), "captions": len(items)},
+        "yt-dlp": {"seconds": round(vtt_s, 4), "captions": len(vtt_items)},
+    }
+
+
+def bench_extract_video_id(n):
+    urls = [URL_SHAPES[i % len(URL_SHAPES)].format(id=f"x{i % 1000:010d}") for i in range(n)]
+    t0 = time.perf_counter()
+    found = sum(1 for u in urls if app.extract_video_id(u))
+    elapsed = time.perf_counter() - t0
+    return {"calls": n, "matched": found, "per_call_us": round(elapsed / n * 1e6, 3)}
+
+
+def bench_verdict(seconds, repeat):
+    transcript = Transcript.from_items(transcript_entries(seconds))
+    best, verdict = best_of(lambda: app.get_fact_check_verdict(transcript), repeat)
+    return {"captions": len(transcript), "seconds": round(best, 4), "verdict": verdict["verdict"]}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--distinct", type=int, default=0, help="distinct video ids (default: one per request, all cold)")
+    ap.add_argument("--sizes", nargs="+", default=["short", "episode", "hour"], choices=sorted(SIZES))
+    ap.add_argument("--api-latency", type=float, default=0.2)
+    ap.add_argument("--api-fail", type=float, default=0.0)
+    ap.add_argument("--ytdlp-latency", type=float, default=1.5)
+    ap.add_argument("--ytdlp-fail", type=float, default=0.0)
+    ap.add_argument("--data-api-latency", type=float, default=0.1)
+    ap.add_argument("--data-api-fail", type=float, default=0.0)
+    ap.add_argument("--repeat", type=int, default=3, help="repeats per micro-benchmark (best is reported)")
+    ap.add_argument("--subs-url", action="store_true", help="yt-dlp fake serves subtitles by URL over local HTTP")
+    ap.add_argument("--skip-load", action="store_true")
+    args = ap.parse_args(argv)
+    out = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        run(args, lambda result: print(json.dumps(result), file=out, flush=True))
+
+
+def run(args, emit):
+    sizes = [SIZES[s] for s in args.sizes]
+
+    if not args.skip_load:
+        fakes = install(
+            app,
+            sizes=sizes,
+            api=Backend(args.api_latency, failure_rate=args.api_fail, seed=1),
+            ytdlp=Backend(args.ytdlp_latency, failure_rate=args.ytdlp_fail, seed=2),
+            data_api=Backend(args.data_api_latency, failure_rate=args.data_api_fail, seed=3),
+            subs_url=args.subs_url,
+        )
+        result = bench_analyze(args.requests, args.concurrency, args.distinct or args.requests)
+        result.update({
+            "bench": "analyze",
+            "sizes": args.sizes,
+            "backend_calls": {name: b.calls for name, b in fakes.items()},
+            "backends": {
+                "transcript": app.transcript_router.stats(),
+                "metadata": app.metadata_router.stats(),
+            },
+        })
+        emit(result)
+
+    for name in args.sizes:
+        emit({
+            "bench": "transcript_parse", "size": name, "subs_url": args.subs_url,
+            **bench_transcript_parse(SIZES[name], args.repeat, args.subs_url),
+        })
+    emit({"bench": "extract_video_id", **bench_extract_video_id(100_000)})
+    for name in args.sizes:
+        emit({"bench": "fact_check_verdict", "size": name, **bench_verdict(SIZES[name], args.repeat)})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start benchmark: how long `import app` takes in a fresh interpreter and
+which top-level packages that time goes to.
+
+    python -m benchmarks.bench_startup [--repeat 5] [--top 10]
+
+Prints one JSON object. `heavy_loaded` lists optional backends that were
+imported during startup - it should stay empty (they load on first use).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("googleapiclient", "yt_dlp", "crewai")
+_PROBE = (
+    "import sys, app; "
+    f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+)
+
+
+def _run(args):
+    env = dict(
+        os.environ,
+        TRANSCRIPT_CACHE_PATH="", LLM_CACHE_PATH="", CLAIM_INDEX_PATH="", JOBS_DB_PATH="", TRANSCRIPT_INDEX_PATH="",
+    )
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def import_breakdown(top):
+    """Cumulative -X importtime milliseconds for each module app.py pulls in directly."""
+    proc = _run(["-X", "importtime", "-c", "import app"])
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | <2 spaces per depth level>package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(cumulative)))
+    # importtime prints children before their parent: app's direct imports are the
+    # depth-1 rows between the previous depth-0 row and app itself
+    children = {}
+    end = max(i for i, (d, n, _) in enumerate(rows) if d == 0 and n == "app")
+    for depth, name, cumulative in reversed(rows[:end]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children[name] = cumulative
+    ranked = sorted(children.items(), key=lambda kv: -kv[1])[:top]
+    return {name: round(us / 1000, 2) for name, us in ranked}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args(argv)
+
+    baseline = min(_timed(["-c", "pass"]) for _ in range(args.repeat))
+    samples = []
+    heavy = ""
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        heavy = _run(["-c", _PROBE]).stdout.strip()
+        samples.append(time.perf_counter() - t0)
+
+    print(json.dumps({
+        "bench": "startup",
+        "import_app_seconds": round(min(samples) - baseline, 4),
+        "interpreter_seconds": round(baseline, 4),
+        "top_imports_ms": import_breakdown(args.top),
+        "heavy_loaded": [m for m in heavy.split(",") if m],
+    }))
+
+
+def _timed(args):
+    t0 = time.perf_counter()
+    _run(args)
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_vtt.py
+"""
+Micro-benchmark: streaming VTT parser vs. the previous read-everything parser.
+
+    python -m benchmarks.bench_vtt [--hours 0.1 1 4 10] [--repeat 3]
+
+Prints one JSON object per fixture size with wall time, peak traced memory
+and item counts for both parsers.
+"""
+import argparse
+import json
+import os
+import re
+import time
+import tracemalloc
+
+from benchmarks.fixtures import rolling_vtt_file
+from vtt_parser import iter_vtt_file, vtt_time_to_seconds
+
+
+def legacy_parse(path):
+    """The pre-streaming fallback parser, kept here only as a baseline."""
+    with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+        vtt_text = fh.read()
+    vtt_text = re.sub(r'^\s*WEBVTT.*\n', "", vtt_text, flags=re.IGNORECASE)
+    blocks = [b.strip() for b in re.split(r'\n\s*\n', vtt_text) if b.strip()]
+    items = []
+    time_re = re.compile(
+        r'(\d{1,2}:\d{2}:\d{2}\.\d{3}|\d{1,2}:\d{2}\.\d{3}|\d{1,2}:\d{2}:\d{2}\.\d{2,3})\s*-->\s*(\d{1,2}:\d{2}:\d{2}\.\d{3}|\d{1,2}:\d{2}\.\d{3})'
+    )
+    for block in blocks:
+        m = time_re.search(block)
+        if not m:
+            continue
+        lines = block.splitlines()
+        text_lines = []
+        for i, line in enumerate(lines):
+            if time_re.search(line):
+                text_lines = lines[i + 1:]
+                break
+        caption_text = " ".join([l.strip() for l in text_lines]).strip()
+        if caption_text:
+            items.append({"start": vtt_time_to_seconds(m.group(1)), "text": caption_text})
+    return items
+
+
+def measure(fn, path, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n = len(fn(path))
+        best = min(best or 1e9, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(best, 4), "peak_bytes": peak, "items": n}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--hours", type=float, nargs="+", default=[0.1, 1.0, 4.0])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    for hours in args.hours:
+        path = rolling_vtt_file(hours * 3600)
+        try:
+            result = {
+                "bench": "vtt_parse",
+                "hours": hours,
+                "file_bytes": os.path.getsize(path),
+                "streaming": measure(lambda p: list(iter_vtt_file(p)), path, args.repeat),
+                "legacy": measure(legacy_parse, path, args.repeat),
+            }
+        finally:
+            os.remove(path)
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
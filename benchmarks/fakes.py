@@ -0,0 +1,240 @@
+# benchmarks/fakes.py
+"""
+Local stand-ins for the YouTube backends app.py talks to, so the request path
+can be benchmarked offline:
+
+  - FakeTranscriptApi: youtube_transcript_api's YouTubeTranscriptApi.list_transcripts
+  - fake_youtube_dl(): yt_dlp.YoutubeDL (extract_info with inline VTT subtitles,
+                       or with subs_url=True a subtitle URL served over local HTTP)
+  - FakeDataApi:       the googleapiclient YouTube Data API v3 Resource
+
+Each takes a Backend profile (latency, jitter, failure rate). Video length is
+derived from the video id, so the same id always gets the same transcript;
+`sizes` picks which lengths occur (1-minute shorts ... 10-hour streams).
+
+    fakes = install(app, sizes=[60, 3600], api=Backend(latency=0.2, failure_rate=0.05), subs_url=True)
+"""
+import functools
+import io
+import random
+import threading
+import time
+import urllib.request
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fixtures import caption_lines, write_rolling_vtt
+
+SIZES = {"short": 60, "episode": 20 * 60, "hour": 3600, "stream": 10 * 3600}
+# distinct caption texts per size; generated fixtures are memoized so building them
+# (seconds for a 10-hour VTT) isn't billed to the backend under test
+VARIANTS = 8
+
+
+class BackendError(ConnectionError):
+    """Injected upstream failure (quota, 429, network); a transport error, so it trips breakers."""
+
+
+class Backend:
+    def __init__(self, latency=0.0, jitter=0.25, failure_rate=0.0, seed=0):
+        self.latency = float(latency)
+        self.jitter = float(jitter)          # +/- fraction of latency
+        self.failure_rate = float(failure_rate)
+        self._rnd = random.Random(seed)
+        self.calls = 0
+
+    def hit(self, what):
+        """Sleep for one simulated round trip; raise BackendError at failure_rate."""
+        self.calls += 1
+        if self.latency:
+            time.sleep(max(0.0, self.latency * (1 + self._rnd.uniform(-self.jitter, self.jitter))))
+        if self.failure_rate and self._rnd.random() < self.failure_rate:
+            raise BackendError(f"injected {what} failure")
+
+
+def video_seconds(video_id, sizes):
+    return sizes[zlib.crc32(video_id.encode()) % len(sizes)]
+
+
+def video_seed(video_id):
+    return zlib.crc32(video_id.encode()) // 7 % VARIANTS
+
+
+@functools.lru_cache(maxsize=64)
+def transcript_entries(seconds, seed=0):
+    """youtube_transcript_api fetch() shape: [{"text", "start", "duration"}, ...] (shared - don't mutate)."""
+    return [
+        {"text": line, "start": i * 2.0, "duration": 2.0}
+        for i, line in enumerate(caption_lines(seconds, seed))
+    ]
+
+
+@functools.lru_cache(maxsize=64)
+def vtt_text(seconds, seed=0):
+    buf = io.StringIO()
+    write_rolling_vtt(buf, seconds, seed)
+    return buf.getvalue()
+
+
+# ----------------- Subtitle server -----------------
+_server = None
+_server_lock = threading.Lock()
+
+
+class _SubtitleHandler(BaseHTTPRequestHandler):
+    """GET /<seconds>/<seed>.vtt -> that fixture, like the caption URLs yt-dlp resolves."""
+
+    def do_GET(self):
+        try:
+            seconds, seed = self.path.strip("/").removesuffix(".vtt").split("/")
+            body = vtt_text(float(seconds), int(seed)).encode("utf-8")
+        except ValueError:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/vtt; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def subtitle_server():
+    """Base URL of the local subtitle server, started (as a daemon thread) on first use."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("127.0.0.1", 0), _SubtitleHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="fake-subs", daemon=True).start()
+        return f"http://127.0.0.1:{_server.server_address[1]}"
+
+
+class _FakeTrack:
+    def __init__(self, api, video_id, seconds):
+        self.language_code = "en"
+        self.is_generated = True
+        self.translation_languages = []
+        self._api = api
+        self._video_id = video_id
+        self._seconds = seconds
+
+    def fetch(self):
+        self._api.backend.hit("transcript fetch")
+        return transcript_entries(self._seconds, seed=video_seed(self._video_id))
+
+
+class FakeTranscriptApi:
+    def __init__(self, backend, sizes):
+        self.backend = backend
+        self.sizes = sizes
+
+    def list_transcripts(self, video_id):
+        self.backend.hit("transcript list")
+        return [_FakeTrack(self, video_id, video_seconds(video_id, self.sizes))]
+
+
+def fake_youtube_dl(backend, sizes, subs_url=False):
+    """
+    A YoutubeDL-compatible class bound to a Backend profile. With subs_url the
+    subtitle track is a URL on subtitle_server(), fetched through urlopen().
+    """
+    base = subtitle_server() if subs_url else None
+
+    class FakeYoutubeDL:
+        def __init__(self, opts=None):
+            self.opts = opts or {}
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def urlopen(self, url):
+            # like yt-dlp's, the response closes itself once the body is read
+            return urllib.request.urlopen(url, timeout=30)
+
+        def extract_info(self, url, download=False):
+            backend.hit("yt-dlp extract_info")
+            video_id = url.rsplit("=", 1)[-1]
+            seconds = video_seconds(video_id, sizes)
+            info = {
+                "id": video_id,
+                "title": f"Video {video_id}",
+                "uploader": "Bench Channel",
+                "view_count": 1000,
+                "like_count": 10,
+                "comment_count": 1,
+            }
+            if self.opts.get("writesubtitles") or self.opts.get("writeautomaticsub"):
+                seed = video_seed(video_id)
+                if base:
+                    track = {"ext": "vtt", "url": f"{base}/{seconds}/{seed}.vtt"}
+                else:
+                    track = {"ext": "vtt", "data": vtt_text(seconds, seed=seed)}
+                info["requested_subtitles"] = {"en": track}
+            return info
+
+    return FakeYoutubeDL
+
+
+class _Call:
+    def __init__(self, backend, result):
+        self._backend = backend
+        self._result = result
+
+    def execute(self):
+        self._backend.hit("Data API")
+        return self._result()
+
+
+class FakeDataApi:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def videos(self):
+        return self
+
+    def channels(self):
+        return _Channels(self.backend)
+
+    def list(self, part, id):
+        ids = id.split(",")
+        return _Call(self.backend, lambda: {"items": [
+            {
+                "id": v,
+                "snippet": {"title": f"Video {v}", "channelTitle": "Bench Channel", "channelId": f"UC{v[:4]}"},
+                "statistics": {"viewCount": "1000", "likeCount": "10", "commentCount": "1"},
+            }
+            for v in ids
+        ]})
+
+
+class _Channels:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def list(self, part, id):
+        return _Call(self.backend, lambda: {"items": [
+            {"id": c, "statistics": {"subscriberCount": "12345"}} for c in id.split(",")
+        ]})
+
+
+def install(app, sizes=(60,), api=None, ytdlp=None, data_api=None, subs_url=False):
+    """
+    Point app's upstreams at fakes; returns {"api", "yt-dlp", "data-api"} Backend profiles.
+    subs_url: yt-dlp serves subtitles by URL (local HTTP) instead of inline data.
+    """
+    api = api or Backend()
+    ytdlp = ytdlp or Backend()
+    data_api = data_api or Backend()
+    sizes = list(sizes)
+    app.YouTubeTranscriptApi = FakeTranscriptApi(api, sizes)
+    ydl_class = fake_youtube_dl(ytdlp, sizes, subs_url=subs_url)
+    app.youtube_dl_class = lambda: ydl_class
+    client = FakeDataApi(data_api)
+    app.youtube_client = lambda: client
+    return {"api": api, "yt-dlp": ytdlp, "data-api": data_api}
@@ -0,0 +1,53 @@
+# benchmarks/fixtures.py
+"""Synthetic caption fixtures shaped like YouTube output (no network needed)."""
+import os
+import random
+import tempfile
+
+WORDS = (
+    "the data shows that this study was peer reviewed and the results are "
+    "not what people expect when they hear about climate vaccines economy "
+    "markets energy science history space rockets battery cars phones"
+).split()
+
+
+def _ts(sec: float) -> str:
+    h = int(sec // 3600)
+    m = int(sec % 3600 // 60)
+    return f"{h:02d}:{m:02d}:{sec % 60:06.3f}"
+
+
+def caption_lines(seconds: float, seed: int = 0, line_every: float = 2.0):
+    """Yield plain caption lines, one per `line_every` seconds of video."""
+    rnd = random.Random(seed)
+    for _ in range(int(seconds / line_every)):
+        yield " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(4, 9)))
+
+
+def write_rolling_vtt(fh, seconds: float, seed: int = 0):
+    """
+    Write a YouTube auto-caption style VTT: each line appears with inline word
+    timings, then a 10ms "hold" cue, then rolls up under the next line.
+    """
+    fh.write("WEBVTT\nKind: captions\nLanguage: en\n\n")
+    t = 0.0
+    prev = None
+    for line in caption_lines(seconds, seed):
+        words = line.split()
+        timed = words[0] + "".join(
+            f"<{_ts(t + 0.2 * (i + 1))}><c> {w}</c>" for i, w in enumerate(words[1:])
+        )
+        fh.write(f"{_ts(t)} --> {_ts(t + 1.99)} align:start position:0%\n")
+        fh.write((prev if prev else " ") + "\n" + timed + "\n\n")
+        fh.write(f"{_ts(t + 1.99)} --> {_ts(t + 2.0)} align:start position:0%\n")
+        fh.write(line + "\n \n\n")
+        prev = line
+        t += 2.0
+
+
+def rolling_vtt_file(seconds: float, seed: int = 0) -> str:
+    """Create a temp .vtt fixture and return its path (caller deletes it)."""
+    fd, path = tempfile.mkstemp(suffix=".vtt", prefix="bench_")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        write_rolling_vtt(fh, seconds, seed)
+    return path
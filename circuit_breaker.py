@@ -0,0 +1,162 @@
+# circuit_breaker.py
+"""
+Per-backend health tracking and routing between interchangeable upstreams
+(e.g. youtube_transcript_api vs yt-dlp).
+
+Each backend gets a CircuitBreaker that keeps an error-rate and a latency
+EWMA. Too many failures trip it open: the backend is skipped for `cooldown`
+seconds, then a single half-open probe decides whether it closes again.
+A Router orders the backends that are currently allowed, fastest first.
+
+    router = Router(["api", "yt-dlp"])
+    for name in router.order():
+        try:
+            result = router.call(name, fetchers[name], video_id)
+        except Exception:
+            continue
+"""
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name, failures=3, error_rate=0.5, min_calls=10, cooldown=30.0, alpha=0.2):
+        self.name = name
+        self.failures = max(1, int(failures))      # consecutive failures that trip it
+        self.error_rate = float(error_rate)        # ... or this error EWMA (after min_calls)
+        self.min_calls = int(min_calls)
+        self.cooldown = float(cooldown)
+        self.alpha = float(alpha)
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.calls = 0
+        self.errors = 0
+        self.trips = 0
+        self.consecutive = 0
+        self.error_ewma = 0.0
+        self.latency_ewma = None
+        self._opened_at = 0.0
+        self._probe_at = None  # monotonic time the half-open probe was handed out
+
+    def allow(self) -> bool:
+        """May a call go to this backend now? Open breakers let one probe through after the cooldown."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == OPEN and now - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probe_at = None
+            # a probe that never reported back (caller gave up) is re-issued after another cooldown
+            if self.state == HALF_OPEN and (self._probe_at is None or now - self._probe_at >= self.cooldown):
+                self._probe_at = now
+                return True
+            return False
+
+    @property
+    def probing(self) -> bool:
+        return self.state == HALF_OPEN
+
+    def record(self, ok: bool, seconds: float):
+        with self._lock:
+            self.calls += 1
+            a = self.alpha
+            self.latency_ewma = seconds if self.latency_ewma is None else a * seconds + (1 - a) * self.latency_ewma
+            self.error_ewma = a * (0.0 if ok else 1.0) + (1 - a) * self.error_ewma
+            if ok:
+                self.consecutive = 0
+                if self.state != CLOSED:
+                    # probe succeeded
+                    self.state = CLOSED
+                    self.error_ewma = 0.0
+                self._probe_at = None
+                return
+            self.errors += 1
+            self.consecutive += 1
+            if self.state == HALF_OPEN or self.consecutive >= self.failures or (
+                self.calls >= self.min_calls and self.error_ewma >= self.error_rate
+            ):
+                if self.state != OPEN:
+                    self.trips += 1
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_at = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "calls": self.calls,
+                "errors": self.errors,
+                "trips": self.trips,
+                "error_rate": round(self.error_ewma, 4),
+                "latency_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            }
+
+
+class Router:
+    """
+    Orders a fixed set of backends for the next call: a half-open probe first (so the
+    probe it was granted is actually spent), then closed ones by latency EWMA, then
+    those with no samples yet (declared order breaks ties).
+    Every `explore`-th ordering uses the declared order instead, so a primary that
+    lost the latency race still gets fresh samples.
+    With is_fault(exc) -> bool, only exceptions it accepts count against a breaker;
+    the rest are answers from a working backend (e.g. "this video is private").
+    """
+
+    def __init__(self, names, explore=20, observer=None, is_fault=None, **breaker_kwargs):
+        # observer(name, ok, seconds) is told about every call, e.g. for metrics
+        self.observer = observer
+        self.is_fault = is_fault
+        self.names = list(names)
+        self.breakers = {n: CircuitBreaker(n, **breaker_kwargs) for n in self.names}
+        self.explore = int(explore)
+        self._n = 0
+        self._lock = threading.Lock()
+
+    def order(self):
+        """Backends to try, in order. If every breaker is open, all are tried (fail open)."""
+        with self._lock:
+            self._n += 1
+            explore = self.explore > 0 and self._n % self.explore == 0
+        allowed = [n for n in self.names if self.breakers[n].allow()]
+        if not allowed:
+            return list(self.names)
+        rank = {n: i for i, n in enumerate(self.names)}
+        if explore:
+            return sorted(allowed, key=lambda n: (not self.breakers[n].probing, rank[n]))
+        def key(n):
+            b = self.breakers[n]
+            return (not b.probing, b.latency_ewma is None, b.latency_ewma or 0.0, rank[n])
+
+        return sorted(allowed, key=key)
+
+    def call(self, name, fn, *args, ok_errors=(), **kwargs):
+        """
+        Run fn on backend `name` and record the outcome. Exceptions in ok_errors are
+        definite answers from a working backend (e.g. "no transcript") and count as successes.
+        """
+        t0 = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except ok_errors:
+            self._record(name, True, time.monotonic() - t0)
+            raise
+        except Exception as e:
+            self._record(name, self.is_fault is not None and not self.is_fault(e), time.monotonic() - t0)
+            raise
+        self._record(name, True, time.monotonic() - t0)
+        return result
+
+    def _record(self, name, ok, seconds):
+        self.breakers[name].record(ok, seconds)
+        if self.observer is not None:
+            self.observer(name, ok, seconds)
+
+    def stats(self):
+        return {n: b.stats() for n, b in self.breakers.items()}
@@ -0,0 +1,199 @@
+# claim_index.py
+"""
+Persistent near-duplicate index of verified claims (MinHash + LSH banding).
+
+Claims are normalized, cut into character shingles and summarized as a
+NUM_PERM-value MinHash signature. The signature is split into BANDS bands;
+claims sharing any band bucket become candidates, and only those candidates
+are compared - so lookups touch a handful of rows however large the index
+grows. With 32 bands x 4 rows, pairs at Jaccard 0.8 become candidates with
+>99.99% probability, pairs at 0.3 with ~23%.
+
+Wording similarity alone can't tell "X was faked" from "X was not faked" or
+"in 1969" from "in 1972", so a match also requires the same numbers and the
+same negation polarity.
+
+Verdicts are stored per model: a lookup only matches claims verified by the
+same model, so switching models (or running the offline stub) never serves
+another model's verdicts. With a ttl, entries older than ttl seconds are
+ignored and overwritten by the next add.
+
+    index = ClaimIndex("claims.sqlite3", threshold=0.8, ttl=None)
+    hit = index.lookup("The moon landing was faked in 1969", model="gpt-4o")   # None or {..., "similarity"}
+    index.add(claim_text, {"verdict": ..., "explanation": ..., "sources": [...]}, model="gpt-4o")
+"""
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE = 5
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# fixed seed: signatures must stay comparable across processes and restarts
+_rnd = random.Random(1337)
+_PERMS = [(_rnd.randrange(1, _PRIME), _rnd.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+_NORM_RE = re.compile(r"[^0-9a-z]+")
+_NUM_RE = re.compile(r"\d+")
+_NEGATIONS = {"not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "t", "cannot"}
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS claims (
+        id        INTEGER PRIMARY KEY,
+        text      TEXT NOT NULL,
+        norm      TEXT NOT NULL,
+        model     TEXT NOT NULL,
+        guard     TEXT NOT NULL,
+        signature BLOB NOT NULL,
+        result    TEXT NOT NULL,
+        created   REAL NOT NULL,
+        UNIQUE (norm, model)
+    )""",
+    """CREATE TABLE IF NOT EXISTS claim_bands (
+        band     INTEGER NOT NULL,
+        bucket   INTEGER NOT NULL,
+        claim_id INTEGER NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS claim_bands_bucket ON claim_bands (band, bucket)",
+)
+
+
+def normalize(text: str) -> str:
+    return _NORM_RE.sub(" ", (text or "").lower()).strip()
+
+
+def guard(norm: str) -> str:
+    """Numbers + negation parity; near-duplicates must agree on this exactly."""
+    negated = sum(1 for w in norm.split() if w in _NEGATIONS) % 2
+    return f"{negated}|{' '.join(sorted(set(_NUM_RE.findall(norm))))}"
+
+
+def shingles(norm: str):
+    if len(norm) <= SHINGLE:
+        return {norm} if norm else set()
+    return {norm[i:i + SHINGLE] for i in range(len(norm) - SHINGLE + 1)}
+
+
+def minhash(norm: str):
+    """NUM_PERM-value signature of a normalized string."""
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles(norm)]
+    if not hashes:
+        return array("Q", [_MAX_HASH] * NUM_PERM)
+    return array("Q", [min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMS])
+
+
+def band_buckets(sig):
+    """One bucket id per band (crc32 of that band's rows)."""
+    return [zlib.crc32(sig[i * ROWS:(i + 1) * ROWS].tobytes()) for i in range(BANDS)]
+
+
+def similarity(sig_a, sig_b) -> float:
+    """Estimated Jaccard similarity of the underlying shingle sets."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+class ClaimIndex:
+    def __init__(self, path=":memory:", threshold=0.8, ttl=None):
+        self.threshold = float(threshold)
+        self.ttl = float(ttl) if ttl else None
+        self._lock = threading.Lock()
+        self._counters = {"lookups": 0, "hits": 0, "candidates": 0, "adds": 0}
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        if path and path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        columns = [r[1] for r in self._db.execute("PRAGMA table_info(claims)")]
+        if columns and "model" not in columns:
+            # index from before verdicts were keyed by model: its rows can't be
+            # attributed to one (and may hold offline-stub results), start over
+            self._db.execute("DROP TABLE claims")
+            self._db.execute("DROP TABLE IF EXISTS claim_bands")
+        for stmt in _SCHEMA:
+            self._db.execute(stmt)
+        self._db.commit()
+        self._count = self._db.execute("SELECT COUNT(*) FROM claims").fetchone()[0]
+
+    def lookup(self, claim_text: str, model: str = ""):
+        """
+        Best claim previously verified by model with similarity >= threshold, as
+        {"claim": text, "similarity": float, **stored_result}; None if there is none.
+        """
+        norm = normalize(claim_text)
+        if not norm:
+            return None
+        sig = minhash(norm)
+        buckets = band_buckets(sig)
+        g = guard(norm)
+        oldest = time.time() - self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            self._counters["lookups"] += 1
+            exact = self._db.execute(
+                "SELECT text, result FROM claims WHERE norm = ? AND model = ? AND created > ?", (norm, model, oldest)
+            ).fetchone()
+            if exact is not None:
+                self._counters["hits"] += 1
+                return {**json.loads(exact[1]), "claim": exact[0], "similarity": 1.0}
+
+            where = " OR ".join(["(band = ? AND bucket = ?)"] * BANDS)
+            params = [v for i, b in enumerate(buckets) for v in (i, b)]
+            ids = [r[0] for r in self._db.execute(
+                f"SELECT DISTINCT claim_id FROM claim_bands WHERE {where}", params
+            )]
+            self._counters["candidates"] += len(ids)
+            best, best_sim = None, self.threshold
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                rows = self._db.execute(
+                    "SELECT text, signature, result FROM claims WHERE guard = ? AND model = ? AND created > ?"
+                    f" AND id IN ({','.join('?' * len(chunk))})",
+                    [g, model, oldest] + chunk,
+                )
+                for text, blob, result in rows:
+                    other = array("Q")
+                    other.frombytes(blob)
+                    sim = similarity(sig, other)
+                    if sim >= best_sim:
+                        best, best_sim = (text, result), sim
+            if best is None:
+                return None
+            self._counters["hits"] += 1
+        return {**json.loads(best[1]), "claim": best[0], "similarity": round(best_sim, 4)}
+
+    def add(self, claim_text: str, result: dict, model: str = ""):
+        """Store model's verification result (verdict/explanation/sources) for claim_text."""
+        norm = normalize(claim_text)
+        if not norm:
+            return
+        sig = minhash(norm)
+        payload = json.dumps({k: v for k, v in result.items() if k in ("verdict", "explanation", "sources")})
+        with self._lock:
+            row = self._db.execute("SELECT id FROM claims WHERE norm = ? AND model = ?", (norm, model)).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE claims SET result = ?, created = ? WHERE id = ?", (payload, time.time(), row[0]))
+            else:
+                cur = self._db.execute(
+                    "INSERT INTO claims (text, norm, model, guard, signature, result, created) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (claim_text, norm, model, guard(norm), sig.tobytes(), payload, time.time()),
+                )
+                self._db.executemany(
+                    "INSERT INTO claim_bands (band, bucket, claim_id) VALUES (?, ?, ?)",
+                    [(i, b, cur.lastrowid) for i, b in enumerate(band_buckets(sig))],
+                )
+                self._count += 1
+            self._counters["adds"] += 1
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._counters)
+            out["claims"] = self._count
+        out["hit_rate"] = round(out["hits"] / out["lookups"], 4) if out["lookups"] else 0.0
+        return out
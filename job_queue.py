@@ -0,0 +1,245 @@
+# job_queue.py
+"""
+Background analysis jobs with results persisted in SQLite.
+
+A fixed number of worker threads drain an in-process queue; every state
+change is written to the jobs table, so status and results survive the
+request that created them (and a restart - unfinished jobs are re-queued).
+Submitting the same work (same dedupe key) while a job for it is still
+queued or running returns that job instead of creating another.
+
+Several processes may share one database. A running job is leased to the
+process running it (owner + lease_until); a heartbeat thread renews the
+leases of its own jobs every lease/3 seconds and re-queues running jobs
+whose lease ran out, i.e. whose process died. Live jobs of other processes
+are left alone.
+
+    jobs = JobQueue("jobs.sqlite3", handler, workers=4, lease=60)
+    job_id, attached = jobs.submit("dQw4w9WgXcQ", {"claims": True})
+    jobs.get(job_id)   # {"id", "status", "stage", "progress", "result" | "error", ...}
+
+handler(video_id, params, progress) returns a JSON-serializable result and may
+call progress(stage, fraction) to report where it is.
+"""
+import json
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS jobs (
+        id        TEXT PRIMARY KEY,
+        video_id  TEXT NOT NULL,
+        dedupe    TEXT NOT NULL,
+        params    TEXT NOT NULL,
+        status    TEXT NOT NULL,
+        stage     TEXT,
+        progress  REAL NOT NULL DEFAULT 0,
+        result    TEXT,
+        error     TEXT,
+        created   REAL NOT NULL,
+        updated   REAL NOT NULL,
+        owner     TEXT,
+        lease_until REAL
+    )""",
+    "CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe, status)",
+    "CREATE INDEX IF NOT EXISTS jobs_updated ON jobs (updated)",
+)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(self, path, handler, workers=4, max_queued=1000, retention=24 * 3600, lease=60.0):
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.max_queued = max(1, int(max_queued))
+        self.retention = float(retention)
+        self.lease = max(1.0, float(lease))
+        # unique per queue, so a restarted process (even with a reused pid) owns nothing
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._threads = []
+        self._counters = {"submitted": 0, "attached": 0, "done": 0, "failed": 0, "recovered": 0}
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        if path and path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        for stmt in _SCHEMA:
+            self._db.execute(stmt)
+        columns = [r[1] for r in self._db.execute("PRAGMA table_info(jobs)")]
+        for col, decl in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if col not in columns:
+                # jobs table from before leases: its running jobs (NULL lease) count as expired
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {col} {decl}")
+        self._db.commit()
+        self._recover()
+        for (job_id,) in self._db.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created", (QUEUED,)):
+            self._queue.put(job_id)
+        if not self._queue.empty():
+            # recovered jobs must run without waiting for the next submit()
+            self._start()
+
+    def _start(self):
+        # workers start on first use (or when jobs were recovered), not at import
+        if self._threads:
+            return
+        for i in range(self.workers):
+            t = threading.Thread(target=self._work, name=f"job-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def _recover(self):
+        """Re-queue running jobs whose lease ran out (their process died); returns their ids."""
+        now = time.time()
+        with self._lock:
+            expired = [r[0] for r in self._db.execute(
+                "SELECT id FROM jobs WHERE status = ? AND (lease_until IS NULL OR lease_until < ?)", (RUNNING, now)
+            )]
+            ids = []
+            for job_id in expired:
+                # re-checked per row: the owner (or another process) may have got there first
+                if self._db.execute(
+                    "UPDATE jobs SET status = ?, stage = NULL, progress = 0, owner = NULL, lease_until = NULL,"
+                    " updated = ? WHERE id = ? AND status = ? AND (lease_until IS NULL OR lease_until < ?)",
+                    (QUEUED, now, job_id, RUNNING, now),
+                ).rowcount:
+                    ids.append(job_id)
+            self._db.commit()
+            self._counters["recovered"] += len(ids)
+        return ids
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.lease / 3)
+            try:
+                with self._lock:
+                    self._db.execute(
+                        "UPDATE jobs SET lease_until = ? WHERE owner = ? AND status = ?",
+                        (time.time() + self.lease, self.owner, RUNNING),
+                    )
+                    self._db.commit()
+                for job_id in self._recover():
+                    self._queue.put(job_id)
+            except Exception as e:
+                print("DEBUG: job heartbeat error:", repr(e))
+
+    def submit(self, video_id, params=None):
+        """(job_id, attached): attached is True when an identical queued/running job was reused."""
+        params = params or {}
+        dedupe = video_id + "|" + json.dumps(params, sort_keys=True)
+        now = time.time()
+        with self._lock:
+            self._start()
+            row = self._db.execute(
+                "SELECT id FROM jobs WHERE dedupe = ? AND status IN (?, ?) LIMIT 1", (dedupe, QUEUED, RUNNING)
+            ).fetchone()
+            if row is not None:
+                self._counters["attached"] += 1
+                return row[0], True
+            if self._queue.qsize() >= self.max_queued:
+                raise QueueFull(f"Job queue is full ({self.max_queued} waiting)")
+            job_id = uuid.uuid4().hex
+            self._db.execute(
+                "INSERT INTO jobs (id, video_id, dedupe, params, status, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, video_id, dedupe, json.dumps(params), QUEUED, now, now),
+            )
+            if self.retention:
+                self._db.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND updated < ?", (DONE, FAILED, now - self.retention)
+                )
+            self._db.commit()
+            self._counters["submitted"] += 1
+        self._queue.put(job_id)
+        return job_id, False
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, video_id, status, stage, progress, result, error, created, updated FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        out = {
+            "id": row[0],
+            "video_id": row[1],
+            "status": row[2],
+            "stage": row[3],
+            "progress": round(row[4], 3),
+            "created": row[7],
+            "updated": row[8],
+        }
+        if row[2] == DONE:
+            out["result"] = json.loads(row[5]) if row[5] else None
+        elif row[2] == FAILED:
+            out["error"] = row[6]
+        return out
+
+    def _set(self, job_id, **fields):
+        fields["updated"] = time.time()
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {cols} WHERE id = ?", (*fields.values(), job_id))
+            self._db.commit()
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            except Exception as e:
+                print("DEBUG: job worker error:", repr(e))
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id):
+        with self._lock:
+            # claim: only one worker can move the job from queued to running
+            now = time.time()
+            claimed = self._db.execute(
+                "UPDATE jobs SET status = ?, stage = ?, progress = 0, updated = ?, owner = ?, lease_until = ?"
+                " WHERE id = ? AND status = ?",
+                (RUNNING, "started", now, self.owner, now + self.lease, job_id, QUEUED),
+            ).rowcount
+            self._db.commit()
+            if not claimed:
+                return
+            row = self._db.execute("SELECT video_id, params FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        video_id, params = row[0], json.loads(row[1])
+
+        def progress(stage, fraction):
+            self._set(job_id, stage=stage, progress=max(0.0, min(1.0, float(fraction))))
+
+        try:
+            result = self.handler(video_id, params, progress)
+        except Exception as e:
+            print("DEBUG: job failed:", job_id, repr(e))
+            self._set(job_id, status=FAILED, error=f"Job failed: {str(e)}")
+            with self._lock:
+                self._counters["failed"] += 1
+            return
+        self._set(job_id, status=DONE, stage="done", progress=1.0, result=json.dumps(result))
+        with self._lock:
+            self._counters["done"] += 1
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._counters)
+        out["queued"] = self._queue.qsize()
+        out["workers"] = self.workers
+        return out
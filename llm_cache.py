@@ -0,0 +1,127 @@
+# llm_cache.py
+"""
+Content-addressed cache for LLM replies, backed by SQLite.
+
+Key = sha256(model, agent role, prompt), so re-analyses, mirrored clips and
+claims repeated across videos are answered locally. Size is bounded by
+evicting least-recently-used rows; entries can optionally expire.
+
+    cache = LLMCache("llm_cache.sqlite3", max_entries=100_000, ttl=None)
+    llm = cached(llm, cache)          # llm(role, prompt) -> str, now cached
+    cache.stats()                     # hits / misses / hit_rate / ...
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_replies (
+    key       TEXT PRIMARY KEY,
+    reply     TEXT NOT NULL,
+    created   REAL NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+def cache_key(model: str, role: str, prompt: str) -> str:
+    h = hashlib.sha256()
+    for part in (model, role, prompt):
+        h.update((part or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path=":memory:", max_entries=100_000, ttl=None):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl) if ttl else None
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "writes": 0}
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        if path and path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_replies_last_used ON llm_replies (last_used)")
+        self._db.commit()
+        self._count = self._db.execute("SELECT COUNT(*) FROM llm_replies").fetchone()[0]
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT reply, created FROM llm_replies WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            if self.ttl is not None and row[1] + self.ttl <= now:
+                self._db.execute("DELETE FROM llm_replies WHERE key = ?", (key,))
+                self._db.commit()
+                self._count -= 1
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._db.execute("UPDATE llm_replies SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self._counters["hits"] += 1
+            return row[0]
+
+    def put(self, key: str, reply: str):
+        now = time.time()
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO llm_replies (key, reply, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, reply, now, now),
+            )
+            if cur.rowcount:
+                self._count += 1
+            else:
+                self._db.execute(
+                    "UPDATE llm_replies SET reply = ?, created = ?, last_used = ? WHERE key = ?",
+                    (reply, now, now, key),
+                )
+            self._counters["writes"] += 1
+            if self._count > self.max_entries:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        # drop ~10% beyond the bound at once so eviction isn't paid on every write
+        n = self._count - self.max_entries + max(1, self.max_entries // 10)
+        cur = self._db.execute(
+            "DELETE FROM llm_replies WHERE key IN "
+            "(SELECT key FROM llm_replies ORDER BY last_used LIMIT ?)",
+            (n,),
+        )
+        self._count -= cur.rowcount
+        self._counters["evictions"] += cur.rowcount
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._counters)
+            out["entries"] = self._count
+        total = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / total, 4) if total else 0.0
+        return out
+
+
+def cached(llm, cache: LLMCache, model=None):
+    """
+    Wrap an llm(role, prompt) -> str callable with `cache`.
+    model defaults to llm.model (or the callable's type name) and is part of the key,
+    so switching models never serves another model's replies. Errors/empty replies aren't cached.
+    """
+    model = model or getattr(llm, "model", None) or type(llm).__name__
+
+    def call(role, prompt):
+        key = cache_key(model, role, prompt)
+        reply = cache.get(key)
+        if reply is not None:
+            return reply
+        reply = llm(role, prompt)
+        if reply:
+            cache.put(key, reply)
+        return reply
+
+    call.model = model
+    return call
@@ -0,0 +1,250 @@
+# metrics.py
+"""
+Per-stage latency metrics, Server-Timing and a slow-request sampling profiler.
+
+    record("transcript", 0.42, backend="api", outcome="ok")
+    render()  -> Prometheus text exposition (yt_stage_seconds histogram + caller's gauges)
+
+Stage timings recorded while a request is being served (see begin/end) are
+also returned by end() for its Server-Timing header. With METRICS=0 record()
+returns immediately and no request state is kept.
+
+The profiler (PROFILE_SLOW_MS > 0) samples thread stacks every
+PROFILE_INTERVAL_MS while requests are in flight. Each request is credited
+with its own thread plus the pool threads running work for it (submitted via
+run_for_request); requests slower than the threshold are written to
+PROFILE_DIR as collapsed stacks (one "frame;frame;frame count" line each,
+flamegraph.pl / speedscope format).
+"""
+import contextvars
+import os
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+ENABLED = os.getenv("METRICS", "1") != "0"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 60.0)
+
+_lock = threading.Lock()
+_histograms = {}  # (stage, backend, outcome) -> [bucket counts..., +Inf count, sum]
+_timings = contextvars.ContextVar("stage_timings", default=None)
+# the current request's profiler samples (None when not profiling)
+_samples = contextvars.ContextVar("profile_samples", default=None)
+
+
+def record(stage, seconds, backend="", outcome="ok"):
+    """Add one stage duration to the histogram (and to the current request's Server-Timing)."""
+    if not ENABLED:
+        return
+    key = (stage, backend, outcome)
+    i = bisect_left(BUCKETS, seconds)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        h[i] += 1
+        h[-1] += seconds
+    timings = _timings.get()
+    if timings is not None:
+        timings.append((stage, backend, seconds))
+
+
+class timer:
+    """with timer("verdict"): ... records the block's duration (outcome="error" if it raised)."""
+
+    __slots__ = ("stage", "backend", "_t0")
+
+    def __init__(self, stage, backend=""):
+        self.stage = stage
+        self.backend = backend
+
+    def __enter__(self):
+        self._t0 = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.stage, time.monotonic() - self._t0, self.backend, "error" if exc_type else "ok")
+
+
+# ---- per-request collection ----
+def begin():
+    """Start collecting stage timings for the current request; returns a token for end()."""
+    if not ENABLED:
+        return None
+    prof = profiler.start() if profiler else None
+    return (_timings.set([]), time.monotonic(), prof, _samples.set(prof))
+
+
+def end(token, label="", outcome="ok"):
+    """
+    Stop collecting and record the whole request as stage "request" (backend=label).
+    Returns the Server-Timing header value ("" if disabled).
+    """
+    if token is None:
+        return ""
+    var_token, t0, prof, samples_token = token
+    total = time.monotonic() - t0
+    timings = _timings.get() or []
+    _timings.reset(var_token)
+    _samples.reset(samples_token)
+    record("request", total, label, outcome)
+    if prof is not None:
+        profiler.stop(prof, total, label)
+    parts = []
+    for stage, backend, seconds in timings:
+        desc = f';desc="{backend}"' if backend else ""
+        parts.append(f"{stage};dur={seconds * 1000:.1f}{desc}")
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def run_for_request(fn, *args, **kwargs):
+    """
+    fn(*args, **kwargs) on a pool thread, credited to the request whose context this
+    runs in (submit as pool.submit(contextvars.copy_context().run, run_for_request, fn, ...)).
+    """
+    samples = _samples.get()
+    if samples is None:
+        return fn(*args, **kwargs)
+    profiler.attach(samples)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler.detach()
+
+
+# ---- exposition ----
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def render(extra=None):
+    """
+    Prometheus text format. extra: {metric_name: {labels_tuple: value}} for gauges
+    the caller computes on scrape (cache sizes, breaker states, ...).
+    """
+    with _lock:
+        hists = {k: list(v) for k, v in _histograms.items()}
+    lines = [
+        "# HELP yt_stage_seconds Duration of analysis stages.",
+        "# TYPE yt_stage_seconds histogram",
+    ]
+    for (stage, backend, outcome), h in sorted(hists.items()):
+        base = [("stage", stage), ("backend", backend), ("outcome", outcome)]
+        cumulative = 0
+        for le, n in zip(BUCKETS, h):
+            cumulative += n
+            lines.append(f"yt_stage_seconds_bucket{_fmt_labels(base + [('le', repr(le))])} {cumulative}")
+        cumulative += h[len(BUCKETS)]
+        lines.append(f"yt_stage_seconds_bucket{_fmt_labels(base + [('le', '+Inf')])} {cumulative}")
+        lines.append(f"yt_stage_seconds_sum{_fmt_labels(base)} {h[-1]:.6f}")
+        lines.append(f"yt_stage_seconds_count{_fmt_labels(base)} {cumulative}")
+    for name, series in sorted((extra or {}).items()):
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in sorted(series.items()):
+            lines.append(f"{name}{_fmt_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# ---- slow-request profiler ----
+class SlowRequestProfiler:
+    """
+    One daemon thread samples sys._current_frames() while any request is in flight.
+    A request collects the stacks of the threads working for it: the thread that
+    called start() and any thread between attach() / detach() (idle pool workers
+    and other requests' threads are not counted). Requests slower than `threshold`
+    seconds are written out, the rest discarded.
+    """
+
+    def __init__(self, threshold, interval=0.01, out_dir=None, max_files=100):
+        self.threshold = float(threshold)
+        self.interval = float(interval)
+        self.out_dir = out_dir or tempfile.gettempdir()
+        self.max_files = int(max_files)
+        self.written = 0
+        self._lock = threading.Lock()
+        self._active = {}  # id -> Counter of collapsed stacks, one per in-flight request
+        self._owners = {}  # thread ident -> Counter of the request it is working for
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        samples = Counter()
+        with self._lock:
+            self._active[id(samples)] = samples
+            self._owners[threading.get_ident()] = samples
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+            self._wake.set()
+        return samples
+
+    def attach(self, samples):
+        """Credit the calling thread's stacks to samples (a request's start()) until detach()."""
+        with self._lock:
+            if id(samples) in self._active:
+                self._owners[threading.get_ident()] = samples
+
+    def detach(self):
+        with self._lock:
+            self._owners.pop(threading.get_ident(), None)
+
+    def stop(self, samples, duration, label=""):
+        with self._lock:
+            self._active.pop(id(samples), None)
+            for ident in [i for i, s in self._owners.items() if s is samples]:
+                del self._owners[ident]
+            if not self._active:
+                self._wake.clear()
+            if duration < self.threshold or not samples or self.written >= self.max_files:
+                return
+            self.written += 1
+        safe = "".join(c if c.isalnum() else "_" for c in label)[:60]
+        path = os.path.join(self.out_dir, f"slow-{int(time.time() * 1000)}-{safe}.folded")
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, n in samples.most_common():
+                    f.write(f"{stack} {n}\n")
+            print(f"DEBUG: slow request ({duration:.2f}s) {label} profiled -> {path}")
+        except Exception as e:
+            print("DEBUG: profiler write error:", repr(e))
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                owners = dict(self._owners)
+            stacks = []
+            for ident, frame in sys._current_frames().items():
+                samples = owners.get(ident)
+                if samples is None:
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                stacks.append((samples, ";".join(reversed(parts))))
+            with self._lock:
+                for samples, stack in stacks:
+                    # skip requests that finished while this sample was taken
+                    if id(samples) in self._active:
+                        samples[stack] += 1
+
+
+_slow_ms = float(os.getenv("PROFILE_SLOW_MS", "0"))
+profiler = SlowRequestProfiler(
+    threshold=_slow_ms / 1000.0,
+    interval=float(os.getenv("PROFILE_INTERVAL_MS", "10")) / 1000.0,
+    out_dir=os.getenv("PROFILE_DIR") or None,
+) if ENABLED and _slow_ms > 0 else None
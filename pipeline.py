@@ -0,0 +1,301 @@
+# pipeline.py
+"""
+Claim pipeline: transcript -> token-budgeted windows -> parallel claim
+extraction -> merge/dedupe -> parallel verification.
+
+The model is injected as a callable `llm(role, prompt) -> str`, where role is
+an agent role from agents.py ("Claim Extractor", "Fact Checker", ...):
+  - agent_llm(): the real CrewAI agents (imports agents.py on first use)
+  - StubLLM():  deterministic, offline - for tests and benchmarks
+default_llm() picks between them with LLM_BACKEND ("agents" | "stub") and
+puts llm_cache in front of it.
+"""
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from claim_index import ClaimIndex
+from llm_cache import LLMCache, cached
+
+CLAIM_WINDOW_TOKENS = int(os.getenv("CLAIM_WINDOW_TOKENS", "1500"))
+CLAIM_PARALLELISM = int(os.getenv("CLAIM_PARALLELISM", "4"))
+# captions repeated at the start of the next window so sentences aren't cut in half
+CLAIM_WINDOW_OVERLAP = 1
+# extractor is asked for at most this many claims per window
+CLAIMS_PER_WINDOW = 8
+
+# replies keyed by hash(model, role, prompt); LLM_CACHE_PATH="" keeps it in memory only
+llm_cache = LLMCache(
+    path=os.getenv("LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "llm_cache.sqlite3")),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000")),
+    ttl=float(os.getenv("LLM_CACHE_TTL", "0")) or None,
+)
+
+# previously verified claims; near-duplicates above the threshold reuse the same model's stored verdict
+claim_index = ClaimIndex(
+    path=os.getenv("CLAIM_INDEX_PATH", os.path.join(tempfile.gettempdir(), "claim_index.sqlite3")),
+    threshold=float(os.getenv("CLAIM_REUSE_THRESHOLD", "0.8")),
+    ttl=float(os.getenv("CLAIM_INDEX_TTL", "0")) or None,
+)
+
+EXTRACTOR_ROLE = "Claim Extractor"
+CHECKER_ROLE = "Fact Checker"
+
+
+def approx_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars/token for English); good enough for budgeting."""
+    return len(text) // 4 + 1
+
+
+def _fmt_ts(seconds: float) -> str:
+    s = int(seconds)
+    return f"{s // 60:02d}:{s % 60:02d}"
+
+
+# ----------------- Windowing -----------------
+def split_windows(captions, max_tokens=CLAIM_WINDOW_TOKENS, overlap=CLAIM_WINDOW_OVERLAP):
+    """
+    Group (start, text) captions into windows of at most ~max_tokens.
+    Windows break only between captions, so every window starts on a caption timestamp.
+    Returns [{"start": float, "end": float, "captions": [(start, text), ...]}, ...].
+    """
+    windows = []
+    current = []
+    used = 0
+    for start, text in captions:
+        # "[mm:ss] text\n" as the line will appear in the prompt
+        cost = approx_tokens(text) + 3
+        if current and used + cost > max_tokens:
+            windows.append(current)
+            current = current[-overlap:] if overlap else []
+            used = sum(approx_tokens(t) + 3 for _, t in current)
+        current.append((start, text))
+        used += cost
+    if current:
+        windows.append(current)
+    return [{"start": w[0][0], "end": w[-1][0], "captions": w} for w in windows]
+
+
+def window_text(window) -> str:
+    return "\n".join(f"[{_fmt_ts(s)}] {t}" for s, t in window["captions"])
+
+
+# ----------------- Prompts / parsing -----------------
+def extraction_prompt(window) -> str:
+    return (
+        f"From the transcript excerpt below, extract up to {CLAIMS_PER_WINDOW} clear factual claims "
+        "that can be verified. Each claim must be a single self-contained sentence.\n"
+        'Respond with a JSON array only: [{"claim": "...", "timestamp": "mm:ss"}, ...]. '
+        "Use the [mm:ss] marker of the line the claim comes from. Return [] if there are none.\n\n"
+        f"Transcript excerpt:\n{window_text(window)}"
+    )
+
+
+def verification_prompt(claim) -> str:
+    return (
+        "Verify the following claim. "
+        'Respond with a JSON object only: {"verdict": "True" | "False" | "Misleading" | "Unverified", '
+        '"explanation": "one or two sentences", "sources": ["url", ...]}.\n\n'
+        f"Claim: {claim['claim']}"
+    )
+
+
+def _parse_ts(value, default):
+    if isinstance(value, (int, float)):
+        return float(value)
+    m = re.fullmatch(r"\s*(?:(\d+):)?(\d+):(\d{2})\s*", str(value or ""))
+    if not m:
+        return default
+    h, mnt, sec = m.groups()
+    return int(h or 0) * 3600 + int(mnt) * 60 + int(sec)
+
+
+def _json_block(text, opener, closer):
+    """First opener..last closer span of a model reply, parsed as JSON (or None)."""
+    text = text or ""
+    i, j = text.find(opener), text.rfind(closer)
+    if i < 0 or j <= i:
+        return None
+    try:
+        return json.loads(text[i:j + 1])
+    except ValueError:
+        return None
+
+
+def parse_claims(reply, window):
+    """Claims from an extractor reply; falls back to bullet/numbered lines."""
+    data = _json_block(reply, "[", "]")
+    out = []
+    if isinstance(data, list):
+        for entry in data:
+            if isinstance(entry, str):
+                entry = {"claim": entry}
+            # one malformed entry (claim missing / not a string) mustn't cost the whole window
+            claim = entry.get("claim") if isinstance(entry, dict) else None
+            if not isinstance(claim, str) or not claim.strip():
+                continue
+            out.append({
+                "claim": claim.strip(),
+                "start": _parse_ts(entry.get("timestamp"), window["start"]),
+            })
+        return out
+    for line in (reply or "").splitlines():
+        m = re.match(r"\s*(?:[-*•]|\d+[.)])\s+(.*\S)", line)
+        if m:
+            out.append({"claim": m.group(1), "start": window["start"]})
+    return out
+
+
+def parse_verification(reply):
+    data = _json_block(reply, "{", "}")
+    if not isinstance(data, dict):
+        return {"verdict": "Unverified", "explanation": (reply or "").strip()[:500], "sources": []}
+    return {
+        "verdict": str(data.get("verdict") or "Unverified"),
+        "explanation": str(data.get("explanation") or ""),
+        "sources": [str(s) for s in (data.get("sources") or []) if s],
+    }
+
+
+# ----------------- Merge / dedupe -----------------
+_NORM_RE = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_claim(text: str) -> str:
+    return _NORM_RE.sub(" ", text.lower()).strip()
+
+
+def merge_claims(claim_lists):
+    """Flatten per-window claims, drop duplicates (same normalized text), keep earliest timestamp."""
+    merged = {}
+    for claims in claim_lists:
+        for c in claims:
+            key = normalize_claim(c["claim"])
+            if not key:
+                continue
+            prev = merged.get(key)
+            if prev is None or c["start"] < prev["start"]:
+                merged[key] = c
+    return sorted(merged.values(), key=lambda c: c["start"])
+
+
+# ----------------- Stages -----------------
+def extract_claims(captions, llm, parallelism=CLAIM_PARALLELISM, max_tokens=CLAIM_WINDOW_TOKENS):
+    """Windows are sent to the extractor concurrently (at most `parallelism` at once)."""
+    windows = split_windows(captions, max_tokens=max_tokens)
+    if not windows:
+        return []
+
+    def run(window):
+        try:
+            return parse_claims(llm(EXTRACTOR_ROLE, extraction_prompt(window)), window)
+        except Exception as e:
+            print("DEBUG: claim extraction error:", repr(e))
+            return []
+
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="claims") as pool:
+        return merge_claims(pool.map(run, windows))
+
+
+def verify_claims(claims, llm, parallelism=CLAIM_PARALLELISM, index=None):
+    """
+    Fact Checker per claim. With an index, near-duplicates of claims already verified
+    by the same model reuse that verdict ("reused_from" + "similarity" added) and new
+    results are indexed - except "Unverified" ones (unparseable replies, failures, the
+    offline stub), which are checked again next time.
+    """
+    model = getattr(llm, "model", None) or type(llm).__name__
+
+    def run(claim):
+        if index is not None:
+            prior = index.lookup(claim["claim"], model=model)
+            if prior is not None:
+                return {
+                    **claim,
+                    "verdict": prior.get("verdict", "Unverified"),
+                    "explanation": prior.get("explanation", ""),
+                    "sources": prior.get("sources", []),
+                    "reused_from": prior["claim"],
+                    "similarity": prior["similarity"],
+                }
+        try:
+            result = parse_verification(llm(CHECKER_ROLE, verification_prompt(claim)))
+        except Exception as e:
+            print("DEBUG: claim verification error:", repr(e))
+            return {**claim, "verdict": "Unverified", "explanation": f"Verification failed: {str(e)}", "sources": []}
+        if index is not None and result["verdict"] != "Unverified":
+            index.add(claim["claim"], result, model=model)
+        return {**claim, **result}
+
+    if not claims:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="verify") as pool:
+        return list(pool.map(run, claims))
+
+
+def run_claim_pipeline(captions, llm=None, parallelism=CLAIM_PARALLELISM, verify=True, index=claim_index):
+    """
+    captions: iterable of (start, text), e.g. a transcript.Transcript.
+    Returns [{"claim", "start", ["verdict", "explanation", "sources"]}, ...] in transcript order.
+    Pass index=None to always re-verify.
+    """
+    llm = llm or default_llm()
+    claims = extract_claims(captions, llm, parallelism=parallelism)
+    return verify_claims(claims, llm, parallelism=parallelism, index=index) if verify else claims
+
+
+# ----------------- LLM backends -----------------
+def default_llm():
+    llm = StubLLM() if os.getenv("LLM_BACKEND", "agents") == "stub" else agent_llm()
+    return cached(llm, llm_cache)
+
+
+def agent_llm():
+    """llm(role, prompt) backed by the CrewAI agents in agents.py (persona as system prompt)."""
+    import agents
+
+    by_role = {
+        a.role: a
+        for a in (agents.summarizer_agent, agents.claim_extractor_agent,
+                  agents.fact_checker_agent, agents.report_writer_agent)
+    }
+
+    def call(role, prompt):
+        agent = by_role[role]
+        system = f"You are the {agent.role}. {agent.backstory}\nYour goal: {agent.goal}"
+        return agent.llm.call([
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt},
+        ])
+
+    call.model = agents.MODEL_NAME
+    return call
+
+
+class StubLLM:
+    """
+    Deterministic offline stand-in: every transcript line containing a number or
+    one of the `cue` words becomes a claim; every claim verifies as "Unverified".
+    """
+
+    model = "stub"
+    cue = ("percent", "study", "data", "million", "billion", "always", "never")
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, role, prompt):
+        self.calls += 1
+        if role == EXTRACTOR_ROLE:
+            claims = []
+            for line in prompt.split("Transcript excerpt:\n", 1)[-1].splitlines():
+                m = re.match(r"\[(\d+:\d{2})\] (.*)", line)
+                if not m:
+                    continue
+                text = m.group(2)
+                if any(ch.isdigit() for ch in text) or any(w in text.lower() for w in self.cue):
+                    claims.append({"claim": text, "timestamp": m.group(1)})
+            return json.dumps(claims[:CLAIMS_PER_WINDOW])
+        return json.dumps({"verdict": "Unverified", "explanation": "Offline stub - not checked.", "sources": []})
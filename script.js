@@ -1,5 +1,8 @@
 /* ======= CONFIG ======= */
 const BACKEND_URL = "http://127.0.0.1:5000/analyze"; // make sure Flask runs at this address
+const TRANSCRIPT_URL = "http://127.0.0.1:5000/transcript"; // paged transcript: /transcript/<video_id>?offset=&limit=
+const TRANSCRIPT_PAGE_SIZE = 200;
+const STREAM_URL = "http://127.0.0.1:5000/analyze/stream"; // SSE: results render stage by stage
 
 /* ======= DOM HOOKS (match your index.html exactly) ======= */
 const urlInput = document.getElementById("urlInput");
@@ -42,24 +45,63 @@ function formatCount(v) {
   return String(v);
 }
 
+// lazy transcript paging state: /analyze only returns the first page
+let transcriptPager = { videoId: null, nextOffset: null, loading: false };
+
 function clearTranscript() {
   transcriptContainer.innerHTML = "";
+  transcriptPager = { videoId: null, nextOffset: null, loading: false };
 }
 
-function renderTranscriptFromArray(items) {
+function appendTranscriptRows(items) {
   // items: [{start, text}, ...]
-  transcriptContainer.innerHTML = "";
+  const frag = document.createDocumentFragment();
   items.forEach(({ start, text }) => {
     const row = document.createElement("div");
     row.className = "row";
     const timeHtml = `<div class="time">${formatTime(start)}</div>`;
     const textHtml = `<div class="text">${escapeHtml(text)}</div>`;
     row.innerHTML = timeHtml + textHtml;
-    transcriptContainer.appendChild(row);
+    frag.appendChild(row);
   });
+  transcriptContainer.appendChild(frag);
+}
+
+function renderTranscriptFromArray(items) {
+  transcriptContainer.innerHTML = "";
+  appendTranscriptRows(items);
   transcriptContainer.scrollTop = 0;
 }
 
+async function loadMoreTranscript() {
+  const { videoId, nextOffset, loading } = transcriptPager;
+  if (!videoId || nextOffset === null || loading) return;
+  transcriptPager.loading = true;
+  try {
+    // the browser revalidates with If-None-Match, so repeat views come back as 304s
+    const res = await fetch(`${TRANSCRIPT_URL}/${encodeURIComponent(videoId)}?offset=${nextOffset}&limit=${TRANSCRIPT_PAGE_SIZE}`);
+    const data = await res.json();
+    // ignore late pages from a previous video
+    if (transcriptPager.videoId !== videoId) return;
+    if (!data || data.error || !Array.isArray(data.items)) {
+      transcriptPager.nextOffset = null;
+      return;
+    }
+    appendTranscriptRows(data.items.map(it => ({ start: it.start ?? 0, text: it.text ?? "" })));
+    transcriptPager.nextOffset = data.next_offset ?? null;
+  } catch (err) {
+    console.error("Transcript page error:", err);
+  } finally {
+    if (transcriptPager.videoId === videoId) transcriptPager.loading = false;
+  }
+}
+
+// fetch the next page when the user scrolls near the bottom of the transcript
+transcriptContainer.addEventListener("scroll", () => {
+  const remaining = transcriptContainer.scrollHeight - transcriptContainer.scrollTop - transcriptContainer.clientHeight;
+  if (remaining < 200) loadMoreTranscript();
+});
+
 function renderTranscriptFromString(text) {
   transcriptContainer.innerHTML = "";
   if (!text || !text.trim()) {
@@ -203,6 +245,58 @@ function setStatsFromResponse(data) {
   metaChannel.textContent = channel || "—";
 }
 
+/* ======= STREAMING ANALYZE (SSE) ======= */
+// Renders each stage as soon as the backend finishes it: metadata, first transcript page, verdict.
+// Resolves true when the stream completed, false if the connection failed (caller falls back to POST).
+function analyzeVideoStream(url) {
+  return new Promise((resolve, reject) => {
+    const es = new EventSource(`${STREAM_URL}?url=${encodeURIComponent(url)}`);
+    let gotTranscript = false;
+    let videoId = null;
+
+    es.addEventListener("video_id", (e) => {
+      videoId = JSON.parse(e.data).video_id ?? null;
+    });
+    es.addEventListener("metadata", (e) => {
+      setStatsFromResponse(JSON.parse(e.data));
+    });
+    es.addEventListener("transcript", (e) => {
+      const d = JSON.parse(e.data);
+      const items = (d.items || []).map(it => ({ start: it.start ?? 0, text: it.text ?? "" }));
+      renderTranscriptFromArray(items);
+      gotTranscript = items.length > 0;
+      // only the first page is streamed; scrolling pages in the rest from /transcript
+      transcriptPager = { videoId, nextOffset: d.next_offset ?? null, loading: false };
+      if (transcriptContainer.scrollHeight <= transcriptContainer.clientHeight) loadMoreTranscript();
+    });
+    es.addEventListener("verdict", (e) => {
+      const d = JSON.parse(e.data);
+      if (!gotTranscript) {
+        transcriptContainer.innerHTML = `<div class="text">No transcript found for this video.</div>`;
+      }
+      renderBadgesFromText(d.fact_check);
+      highlightVerdict(d.fact_check);
+    });
+    es.addEventListener("done", () => {
+      es.close();
+      resolve(true);
+    });
+    // fired both for our own "error" events (with data) and for connection failures (without)
+    es.addEventListener("error", (e) => {
+      es.close();
+      if (!e.data) {
+        resolve(false);
+        return;
+      }
+      let msg = "Analysis failed";
+      try {
+        msg = JSON.parse(e.data).error || msg;
+      } catch (_) { /* keep generic message */ }
+      reject(new Error(msg));
+    });
+  });
+}
+
 /* ======= MAIN ACTION (called by your form onsubmit) ======= */
 async function analyzeVideo() {
   const url = urlInput.value?.trim();
@@ -218,6 +312,16 @@ async function analyzeVideo() {
   highlightVerdict(""); // reset
 
   try {
+    if (window.EventSource) {
+      if (await analyzeVideoStream(url)) {
+        if (factVerdictButtons) factVerdictButtons.style.display = "flex";
+        return;
+      }
+      // stream unavailable (proxy, CORS, dropped connection): redo it as a plain POST
+      console.warn("Analyze stream failed; falling back to POST /analyze");
+      clearTranscript();
+    }
+
     const res = await fetch(BACKEND_URL, {
       method: "POST",
       headers: {
@@ -251,6 +355,13 @@ async function analyzeVideo() {
     const transcriptCandidate = data.transcript ?? data.transcript_text ?? data.text ?? null;
     if (Array.isArray(transcriptCandidate) && transcriptCandidate.length) {
       renderTranscript(transcriptCandidate);
+      transcriptPager = {
+        videoId: data.video_id ?? null,
+        nextOffset: data.transcript_next_offset ?? null,
+        loading: false
+      };
+      // short first page that doesn't fill the panel: pull the next one right away
+      if (transcriptContainer.scrollHeight <= transcriptContainer.clientHeight) loadMoreTranscript();
     } else if (typeof transcriptCandidate === "string" && transcriptCandidate.trim().length) {
       renderTranscript(transcriptCandidate);
     } else {
@@ -0,0 +1,57 @@
+# test_circuit_breaker.py
+"""Circuit breakers and backend ordering:  python -m pytest -q test_circuit_breaker.py"""
+import pytest
+
+from circuit_breaker import OPEN, Router
+
+
+def test_order_by_latency_then_unsampled_in_declared_order():
+    router = Router(["a", "b", "c"], explore=0)
+    assert router.order() == ["a", "b", "c"]
+    router.call("c", lambda: None)
+    router.breakers["c"].latency_ewma = 0.5
+    # sampled backends first; a and b have no latency yet and keep their declared order
+    assert router.order() == ["c", "a", "b"]
+    router.breakers["b"].latency_ewma = 0.1
+    assert router.order() == ["b", "c", "a"]
+
+
+def test_explore_uses_declared_order():
+    router = Router(["a", "b"], explore=2)
+    router.breakers["b"].latency_ewma = 0.1
+    router.breakers["a"].latency_ewma = 0.9
+    assert router.order() == ["b", "a"]
+    assert router.order() == ["a", "b"]
+
+
+def test_open_breaker_is_skipped_and_probe_goes_first():
+    router = Router(["a", "b"], explore=0, failures=1, cooldown=60)
+    with pytest.raises(RuntimeError):
+        router.call("a", _fail)
+    assert router.breakers["a"].state == OPEN
+    assert router.order() == ["b"]
+    router.breakers["a"]._opened_at -= 60
+    router.breakers["b"].latency_ewma = 0.01
+    assert router.order() == ["a", "b"]
+
+
+def test_is_fault_decides_what_counts_against_a_breaker():
+    router = Router(["a"], failures=1, is_fault=lambda e: isinstance(e, OSError))
+    with pytest.raises(LookupError):
+        router.call("a", _fail, LookupError)
+    assert router.stats()["a"]["errors"] == 0
+    with pytest.raises(OSError):
+        router.call("a", _fail, OSError)
+    assert router.stats()["a"]["state"] == OPEN
+
+
+
+def test_ok_errors_are_successes():
+    router = Router(["a"], failures=1, is_fault=lambda e: True)
+    with pytest.raises(LookupError):
+        router.call("a", _fail, LookupError, ok_errors=(LookupError,))
+    assert router.stats()["a"] == {**router.stats()["a"], "calls": 1, "errors": 0, "state": "closed"}
+
+
+def _fail(exc=RuntimeError):
+    raise exc("boom")
@@ -0,0 +1,70 @@
+# test_job_queue.py
+"""Background job queue persistence and leases:  python -m pytest -q test_job_queue.py"""
+import threading
+import time
+
+from job_queue import DONE, RUNNING, JobQueue
+
+
+def wait_for(jobs, job_id, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = jobs.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} not {status}: {jobs.get(job_id)}")
+
+
+def test_submit_runs_and_dedupes():
+    release = threading.Event()
+
+    def handler(video_id, params, progress):
+        progress("working", 0.5)
+        release.wait(5)
+        return {"video": video_id}
+
+    jobs = JobQueue(":memory:", handler, workers=1)
+    job_id, attached = jobs.submit("vid", {"claims": True})
+    assert not attached
+    assert jobs.submit("vid", {"claims": True}) == (job_id, True)
+    release.set()
+    assert wait_for(jobs, job_id, DONE)["result"] == {"video": "vid"}
+
+
+def test_live_jobs_of_another_process_are_not_recovered(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    started, release = threading.Event(), threading.Event()
+
+    def slow(video_id, params, progress):
+        started.set()
+        release.wait(5)
+        return "first"
+
+    first = JobQueue(path, slow, workers=1, lease=60)
+    job_id, _ = first.submit("vid")
+    assert started.wait(5)
+
+    # a second process opening the same database leaves the leased job alone
+    second = JobQueue(path, lambda *a: "second", workers=1, lease=60)
+    assert second.get(job_id)["status"] == RUNNING
+    assert second.stats()["recovered"] == 0
+
+    release.set()
+    assert wait_for(first, job_id, DONE)["result"] == "first"
+
+
+def test_expired_lease_is_recovered(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    dead = JobQueue(path, lambda *a: None, workers=1)
+    # simulate a process that claimed a job and died: running, lease in the past
+    dead._db.execute(
+        "INSERT INTO jobs (id, video_id, dedupe, params, status, created, updated, owner, lease_until)"
+        " VALUES ('j1', 'vid', 'vid|{}', '{}', ?, 0, 0, 'gone:1:x', ?)",
+        (RUNNING, time.time() - 1),
+    )
+    dead._db.commit()
+
+    jobs = JobQueue(path, lambda video_id, params, progress: "again", workers=1)
+    assert jobs.stats()["recovered"] == 1
+    assert wait_for(jobs, "j1", DONE)["result"] == "again"
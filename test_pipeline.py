@@ -0,0 +1,199 @@
+# test_pipeline.py
+"""Claim pipeline driven end to end by StubLLM (offline):  python -m pytest -q test_pipeline.py"""
+import json
+import os
+
+# in-memory LLM cache / claim index: tests leave nothing behind in the temp dir
+for _var in ("LLM_CACHE_PATH", "CLAIM_INDEX_PATH"):
+    os.environ.setdefault(_var, "")
+
+import pipeline
+from claim_index import ClaimIndex
+from pipeline import (
+    CHECKER_ROLE,
+    EXTRACTOR_ROLE,
+    StubLLM,
+    merge_claims,
+    parse_claims,
+    parse_verification,
+    run_claim_pipeline,
+    split_windows,
+)
+
+CAPTIONS = [
+    (0.0, "welcome back to the channel"),
+    (4.0, "a study found 40 percent of people agree"),
+    (9.0, "let's look at the next part"),
+    (15.0, "the company made 3 billion last year"),
+    (21.0, "thanks for watching"),
+]
+WINDOW = {"start": 30.0, "end": 60.0, "captions": []}
+
+
+# ----------------- Windowing -----------------
+def test_split_windows_respects_budget_and_overlap():
+    captions = [(i * 2.0, "word " * 20) for i in range(20)]
+    windows = split_windows(captions, max_tokens=100, overlap=1)
+    assert len(windows) > 1
+    for w in windows:
+        # a single caption may exceed the budget on its own; otherwise windows stay under it
+        cost = sum(pipeline.approx_tokens(t) + 3 for _, t in w["captions"])
+        assert cost <= 100 or len(w["captions"]) == 1
+        assert w["start"] == w["captions"][0][0]
+        assert w["end"] == w["captions"][-1][0]
+    for prev, nxt in zip(windows, windows[1:]):
+        assert nxt["captions"][0] == prev["captions"][-1]
+    # every caption lands in some window
+    seen = {c for w in windows for c in w["captions"]}
+    assert seen == set(captions)
+
+
+def test_split_windows_empty():
+    assert split_windows([]) == []
+
+
+# ----------------- Reply parsing -----------------
+def test_parse_claims_skips_malformed_entries_only():
+    reply = "Here you go:\n" + json.dumps([
+        {"claim": 42, "timestamp": "00:10"},
+        {"claim": None},
+        {"claim": "   "},
+        {"timestamp": "00:12"},
+        ["not", "a", "dict"],
+        {"claim": " The moon is 384,400 km away. ", "timestamp": "01:05"},
+        "Water boils at 100 C.",
+    ])
+    assert parse_claims(reply, WINDOW) == [
+        {"claim": "The moon is 384,400 km away.", "start": 65.0},
+        {"claim": "Water boils at 100 C.", "start": 30.0},
+    ]
+
+
+def test_parse_claims_timestamps():
+    reply = json.dumps([
+        {"claim": "a", "timestamp": "1:02:03"},
+        {"claim": "b", "timestamp": 12.5},
+        {"claim": "c", "timestamp": "soon"},
+    ])
+    assert [c["start"] for c in parse_claims(reply, WINDOW)] == [3723.0, 12.5, 30.0]
+
+
+def test_parse_claims_falls_back_to_list_lines():
+    reply = "Claims:\n- First claim.\n2) Second claim.\nnot a claim"
+    assert parse_claims(reply, WINDOW) == [
+        {"claim": "First claim.", "start": 30.0},
+        {"claim": "Second claim.", "start": 30.0},
+    ]
+
+
+def test_parse_verification():
+    reply = 'Sure. {"verdict": "False", "explanation": "No.", "sources": ["https://a", "", null]}'
+    assert parse_verification(reply) == {"verdict": "False", "explanation": "No.", "sources": ["https://a"]}
+    fallback = parse_verification("I could not decide.")
+    assert fallback["verdict"] == "Unverified"
+    assert fallback["explanation"] == "I could not decide."
+
+
+# ----------------- Merge / dedupe -----------------
+def test_merge_claims_dedupes_and_keeps_earliest():
+    merged = merge_claims([
+        [{"claim": "Sales rose 5%.", "start": 20.0}, {"claim": "?!", "start": 1.0}],
+        [{"claim": "sales ROSE 5%", "start": 8.0}, {"claim": "Other claim", "start": 2.0}],
+    ])
+    assert merged == [
+        {"claim": "Other claim", "start": 2.0},
+        {"claim": "sales ROSE 5%", "start": 8.0},
+    ]
+
+
+# ----------------- Pipeline -----------------
+def test_run_claim_pipeline_with_stub():
+    llm = StubLLM()
+    results = run_claim_pipeline(CAPTIONS, llm=llm, parallelism=2, index=None)
+    assert [(r["claim"], r["start"]) for r in results] == [
+        ("a study found 40 percent of people agree", 4.0),
+        ("the company made 3 billion last year", 15.0),
+    ]
+    assert all(r["verdict"] == "Unverified" and r["sources"] == [] for r in results)
+    # one extractor call (everything fits one window) + one checker call per claim
+    assert llm.calls == 3
+
+
+def test_overlapping_windows_dedupe_claims():
+    captions = [(i * 5.0, f"claim number {i} about the data " + "filler " * 30) for i in range(12)]
+    llm = StubLLM()
+    claims = pipeline.extract_claims(captions, llm, parallelism=4, max_tokens=120)
+    # overlap repeats a caption in consecutive windows; each claim still appears once
+    assert llm.calls > 1
+    assert [c["start"] for c in claims] == [i * 5.0 for i in range(12)]
+
+
+def test_failing_window_does_not_drop_others():
+    stub = StubLLM()
+
+    def llm(role, prompt):
+        if role == EXTRACTOR_ROLE and "[00:15]" in prompt:
+            raise RuntimeError("model unavailable")
+        return stub(role, prompt)
+
+    captions = [(0.0, "5 apples " + "x " * 60), (15.0, "7 pears " + "y " * 60)]
+    claims = pipeline.extract_claims(captions, llm, max_tokens=40)
+    assert [c["start"] for c in claims] == [0.0]
+
+
+class CheckingLLM(StubLLM):
+    """StubLLM whose Fact Checker answers "True"."""
+
+    def __init__(self, model="checker"):
+        super().__init__()
+        self.model = model
+
+    def __call__(self, role, prompt):
+        reply = super().__call__(role, prompt)
+        if role == CHECKER_ROLE:
+            return json.dumps({"verdict": "True", "explanation": "Checked.", "sources": []})
+        return reply
+
+
+def test_verification_reuses_indexed_claims():
+    index = ClaimIndex(":memory:")
+    run_claim_pipeline(CAPTIONS, llm=CheckingLLM(), index=index)
+    again = CheckingLLM()
+    results = run_claim_pipeline(CAPTIONS, llm=again, index=index)
+    assert again.calls == 1  # extraction only; both verdicts come from the index
+    assert all(r["reused_from"] == r["claim"] and r["verdict"] == "True" for r in results)
+
+
+def test_index_is_per_model_and_skips_unverified():
+    index = ClaimIndex(":memory:")
+    run_claim_pipeline(CAPTIONS, llm=StubLLM(), index=index)
+    assert index.stats()["claims"] == 0  # stub verdicts are all "Unverified"
+    run_claim_pipeline(CAPTIONS, llm=CheckingLLM("model-a"), index=index)
+    other = CheckingLLM("model-b")
+    results = run_claim_pipeline(CAPTIONS, llm=other, index=index)
+    assert other.calls == 3  # model-a's verdicts aren't reused
+    assert not any("reused_from" in r for r in results)
+    assert index.lookup(CAPTIONS[1][1], model="model-a")["verdict"] == "True"
+    assert index.lookup(CAPTIONS[1][1], model="stub") is None
+
+
+def test_index_ttl():
+    index = ClaimIndex(":memory:", ttl=60)
+    index.add("the sky is green", {"verdict": "False"}, model="m")
+    assert index.lookup("The sky is green!", model="m")["verdict"] == "False"
+    index._db.execute("UPDATE claims SET created = created - 120")
+    assert index.lookup("The sky is green!", model="m") is None
+
+
+def test_verification_failure_is_reported_per_claim():
+    stub = StubLLM()
+
+    def llm(role, prompt):
+        if role == CHECKER_ROLE and "billion" in prompt:
+            raise RuntimeError("timeout")
+        return stub(role, prompt)
+
+    results = run_claim_pipeline(CAPTIONS, llm=llm, index=None)
+    assert [r["verdict"] for r in results] == ["Unverified", "Unverified"]
+    assert results[0]["explanation"] == "Offline stub - not checked."
+    assert results[1]["explanation"] == "Verification failed: timeout"
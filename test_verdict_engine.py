@@ -0,0 +1,38 @@
+# test_verdict_engine.py
+"""Lexicon verdicts, whole-transcript and windowed:  python -m pytest -q test_verdict_engine.py"""
+from transcript import Transcript
+from verdict_engine import VerdictEngine, WindowedVerdict
+
+LEXICON = {
+    "default": "Verify",
+    "labels": {"False": ["fake news", "debunked"], "True": ["peer reviewed", "confirmed"]},
+}
+CAPTIONS = [
+    (0.0, "this was peer"),
+    (5.0, "reviewed and confirmed"),
+    (70.0, "others call it fake"),
+    (75.0, "news that was debunked"),
+    (130.0, "nothing to see"),
+]
+
+
+def test_check():
+    result = VerdictEngine(LEXICON).check(CAPTIONS)
+    assert result["verdict"] == "False"
+    assert [(e["phrase"], e["start"]) for e in result["evidence"]] == [
+        ("fake news", 70.0), ("debunked", 75.0), ("peer reviewed", 0.0), ("confirmed", 5.0),
+    ]
+
+
+def test_windowed_aggregate_matches_check_across_updates():
+    engine = VerdictEngine(LEXICON)
+    wv = WindowedVerdict(engine, window=60)
+    # grows caption by caption, so phrases span update boundaries
+    for n in range(1, len(CAPTIONS) + 1):
+        result = wv.update(Transcript.from_pairs(CAPTIONS[:n]))
+        expected = engine.check(CAPTIONS[:n])
+        assert result["aggregate"]["verdict"] == expected["verdict"]
+        assert result["aggregate"]["evidence"] == expected["evidence"]
+    assert [e["verdict"] for e in result["timeline"]] == ["True", "False", "Verify"]
+    assert result["aggregate"]["windows"] == {"False": 1, "True": 1}
+    assert wv.rescans == 0
@@ -0,0 +1,67 @@
+# test_vtt_parser.py
+"""Streaming WebVTT parser:  python -m pytest -q test_vtt_parser.py"""
+import io
+
+from benchmarks.fixtures import caption_lines, write_rolling_vtt
+from vtt_parser import iter_vtt_cues, vtt_time_to_seconds
+
+
+def cues(text, **kwargs):
+    return list(iter_vtt_cues(io.StringIO(text), **kwargs))
+
+
+def test_time_to_seconds():
+    assert vtt_time_to_seconds("01:02:03.456") == 3723.456
+    assert vtt_time_to_seconds("02:03.456") == 123.456
+    assert vtt_time_to_seconds("1:02:03,5") == 3723.5
+    assert vtt_time_to_seconds("bogus") == 0.0
+
+
+# ----------------- Rolling auto-captions -----------------
+def test_rolling_track_emits_each_line_once():
+    buf = io.StringIO()
+    write_rolling_vtt(buf, 60, seed=1)
+    expected = [(i * 2.0, line) for i, line in enumerate(caption_lines(60, seed=1))]
+    assert cues(buf.getvalue()) == expected
+
+
+def test_hold_cue_collapses_carried_lines():
+    vtt = (
+        "WEBVTT\nKind: captions\nLanguage: en\n\n"
+        "00:00:00.000 --> 00:00:02.000 align:start position:0%\n"
+        " \nhello<00:00:00.500><c> there</c>\n\n"
+        "00:00:02.000 --> 00:00:02.010 align:start position:0%\n"
+        "hello there\n \n\n"
+        "00:00:02.010 --> 00:00:04.000 align:start position:0%\n"
+        "hello there\ngeneral &amp; kenobi\n\n"
+        "00:00:04.000 --> 00:00:04.010 align:start position:0%\n"
+        "general &amp; kenobi\n \n"
+    )
+    assert cues(vtt) == [(0.0, "hello there"), (2.01, "general & kenobi")]
+
+
+# ----------------- Manual captions -----------------
+MANUAL = (
+    "WEBVTT\n\n"
+    "1\n00:00:01.000 --> 00:00:03.000\nFirst line\nsecond line\n\n"
+    "2\n00:00:03.000 --> 00:00:05.000\nsecond line\nthird line\n"
+)
+
+
+def test_manual_touching_cues_keep_repeated_lines():
+    expected = [(1.0, "First line second line"), (3.0, "second line third line")]
+    assert cues(MANUAL) == expected
+    assert cues(MANUAL, collapse_rolling=False) == expected
+
+
+def test_repeated_short_cues_are_kept():
+    words = ["No.", "Yes.", "No.", "[Music]", "[Music]"]
+    vtt = "WEBVTT\n\n" + "".join(
+        f"00:00:0{i}.000 --> 00:00:0{i + 1}.000\n{w}\n\n" for i, w in enumerate(words)
+    )
+    assert [t for _, t in cues(vtt)] == words
+
+
+def test_missing_end_timestamp_and_no_blank_line():
+    vtt = "﻿WEBVTT\n\nNOTE a --> b\n\n00:01.000 -->\nfirst\n00:02.000 --> 00:03.000\nsecond\n"
+    assert cues(vtt) == [(1.0, "first"), (2.0, "second")]
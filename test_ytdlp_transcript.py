@@ -0,0 +1,84 @@
+# test_ytdlp_transcript.py
+"""yt-dlp subtitle fallback against a local HTTP server:  python -m pytest -q test_ytdlp_transcript.py"""
+import io
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# in-memory caches / stores: tests leave nothing behind in the temp dir
+for _var in ("TRANSCRIPT_CACHE_PATH", "LLM_CACHE_PATH", "CLAIM_INDEX_PATH", "JOBS_DB_PATH", "TRANSCRIPT_INDEX_PATH"):
+    os.environ.setdefault(_var, "")
+
+import pytest
+
+import app
+from benchmarks.fixtures import caption_lines, write_rolling_vtt
+
+SECONDS = 600  # ~100 KB of VTT: several read chunks
+
+
+def _vtt_bytes():
+    buf = io.StringIO()
+    write_rolling_vtt(buf, SECONDS, seed=2)
+    # a multi-byte character lands on most chunk boundaries somewhere
+    return buf.getvalue().replace("the", "thé").encode("utf-8")
+
+
+@pytest.fixture(scope="module")
+def vtt_url():
+    body = _vtt_bytes()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/vtt; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/subs.vtt"
+    server.shutdown()
+    server.server_close()
+
+
+def fake_youtube_dl(track, subtitles=None):
+    """The real yt_dlp.YoutubeDL (so urlopen goes through yt-dlp's HTTP stack) with a canned extract_info."""
+    yt_dlp = pytest.importorskip("yt_dlp")
+
+    class FakeYoutubeDL(yt_dlp.YoutubeDL):
+        def extract_info(self, url, download=False, **kwargs):
+            return {"requested_subtitles": {"en": track}, "subtitles": subtitles or {}}
+
+    return FakeYoutubeDL
+
+
+def expected():
+    return [(i * 2.0, line.replace("the", "thé")) for i, line in enumerate(caption_lines(SECONDS, seed=2))]
+
+
+def test_subtitles_streamed_from_url(vtt_url):
+    items, _ = app._transcript_via_ytdlp("vid", fake_youtube_dl({"ext": "vtt", "url": vtt_url}))
+    assert list(items) == expected()
+
+
+def test_inline_subtitles():
+    data = _vtt_bytes().decode("utf-8")
+    items, _ = app._transcript_via_ytdlp("vid", fake_youtube_dl({"ext": "vtt", "data": data}))
+    assert list(items) == expected()
+
+
+def test_manual_track_is_not_collapsed(vtt_url):
+    track = {"ext": "vtt", "url": vtt_url}
+    items, _ = app._transcript_via_ytdlp("vid", fake_youtube_dl(track, subtitles={"en": [track]}))
+    # every rolled-over and held line is kept as written
+    assert len(items) > len(expected())
+
+
+def test_response_lines_splits_across_chunks():
+    resp = io.BytesIO("a\r\nbé\nc".encode("utf-8"))
+    assert list(app._response_lines(resp, chunk_size=2)) == ["a\r\n", "bé\n", "c"]
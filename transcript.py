@@ -0,0 +1,153 @@
+# transcript.py
+"""
+Compact columnar transcript: a float start-time array, one concatenated text
+buffer and an offset array - instead of one dict (plus boxed float and str)
+per caption.
+
+    t = Transcript.from_items([{"start": 0.0, "text": "hi"}, ...])
+    len(t); t[3] -> (start, text); t[10:20] -> Transcript view (no copy)
+    for start, text in t: ...
+    t.window(60, 120) -> captions starting in [60s, 120s)
+    t.to_items() -> [{"start": ..., "text": ...}]  (JSON edge only)
+
+Slices share the parent's buffers; only the caption text being read is
+materialized, one substring at a time.
+"""
+import hashlib
+import json
+from array import array
+from bisect import bisect_left
+
+
+class Transcript:
+    __slots__ = ("_starts", "_text", "_offsets", "_lo", "_hi")
+
+    def __init__(self, starts=None, text="", offsets=None, lo=0, hi=None):
+        # offsets has len(starts) + 1 entries: caption i is text[offsets[i]:offsets[i + 1]]
+        self._starts = starts if starts is not None else array("d")
+        self._text = text
+        self._offsets = offsets if offsets is not None else array("q", [0])
+        self._lo = lo
+        self._hi = len(self._starts) if hi is None else hi
+
+    # ---- construction ----
+    @classmethod
+    def from_pairs(cls, pairs):
+        """Build from an iterable of (start, text); empty texts are skipped."""
+        b = TranscriptBuilder()
+        for start, text in pairs:
+            b.append(start, text)
+        return b.build()
+
+    @classmethod
+    def from_items(cls, items):
+        """Build from the legacy [{"start": float, "text": str}, ...] shape."""
+        return cls.from_pairs((it.get("start") or 0.0, it.get("text") or "") for it in items)
+
+    # ---- sequence protocol ----
+    def __len__(self):
+        return self._hi - self._lo
+
+    def __bool__(self):
+        return self._hi > self._lo
+
+    def __iter__(self):
+        starts, text, offsets = self._starts, self._text, self._offsets
+        for i in range(self._lo, self._hi):
+            yield starts[i], text[offsets[i]:offsets[i + 1]]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            lo, hi, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("Transcript slices must be contiguous")
+            hi = max(lo, hi)
+            return Transcript(self._starts, self._text, self._offsets, self._lo + lo, self._lo + hi)
+        n = len(self)
+        if key < 0:
+            key += n
+        if not 0 <= key < n:
+            raise IndexError("Transcript index out of range")
+        i = self._lo + key
+        return self._starts[i], self._text[self._offsets[i]:self._offsets[i + 1]]
+
+    def __eq__(self, other):
+        if not isinstance(other, Transcript):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return f"<Transcript {len(self)} captions>"
+
+    # ---- time lookups (captions are in start order) ----
+    def index_at(self, seconds: float) -> int:
+        """Index (relative to this view) of the first caption starting at or after `seconds`."""
+        return bisect_left(self._starts, seconds, self._lo, self._hi) - self._lo
+
+    def window(self, start: float, end: float):
+        """View of captions with start in [start, end)."""
+        return self[self.index_at(start):self.index_at(end)]
+
+    def start_at(self, i: int) -> float:
+        return self[i][0]
+
+    def text(self, sep=" ") -> str:
+        """All caption text joined with sep."""
+        if sep == "":
+            return self._text[self._offsets[self._lo]:self._offsets[self._hi]]
+        return sep.join(t for _, t in self)
+
+    def digest(self) -> str:
+        """Content hash of this view (start times + text), e.g. for ETags."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(self._starts[self._lo:self._hi].tobytes())
+        h.update(self._text[self._offsets[self._lo]:self._offsets[self._hi]].encode("utf-8"))
+        h.update(self._offsets[self._lo:self._hi + 1].tobytes())
+        return h.hexdigest()
+
+    # ---- serialization (JSON edge / cache) ----
+    def to_items(self):
+        return [{"start": s, "text": t} for s, t in self]
+
+    def dumps(self) -> str:
+        """Compact JSON form for storage: {"s": starts, "t": text, "o": offsets}."""
+        base = self._offsets[self._lo]
+        return json.dumps({
+            "s": self._starts[self._lo:self._hi].tolist(),
+            "t": self._text[base:self._offsets[self._hi]],
+            "o": [o - base for o in self._offsets[self._lo:self._hi + 1]],
+        })
+
+    @classmethod
+    def loads(cls, data: str):
+        """Inverse of dumps(); also accepts a JSON list of legacy item dicts."""
+        obj = json.loads(data)
+        if isinstance(obj, list):
+            return cls.from_items(obj)
+        return cls(array("d", obj["s"]), obj["t"], array("q", obj["o"]))
+
+
+class TranscriptBuilder:
+    """Append captions one at a time, then build() a Transcript in one join."""
+
+    __slots__ = ("_starts", "_parts", "_offsets", "_pos")
+
+    def __init__(self):
+        self._starts = array("d")
+        self._parts = []
+        self._offsets = array("q", [0])
+        self._pos = 0
+
+    def append(self, start, text):
+        if not text:
+            return
+        self._starts.append(float(start or 0.0))
+        self._parts.append(text)
+        self._pos += len(text)
+        self._offsets.append(self._pos)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def build(self) -> Transcript:
+        return Transcript(self._starts, "".join(self._parts), self._offsets)
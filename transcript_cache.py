@@ -0,0 +1,202 @@
+# transcript_cache.py
+"""
+Two-tier transcript cache: a bounded in-process LRU in front of a SQLite file.
+
+Entries are keyed by video_id and carry their own expiry, so successful
+transcripts and "no transcript" answers (TranscriptsDisabled /
+NoTranscriptFound) can live for different amounts of time. Expired rows are
+purged from the file every PURGE_INTERVAL seconds.
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+PURGE_INTERVAL = 10 * 60
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS transcripts (
+        video_id   TEXT PRIMARY KEY,
+        items      TEXT NOT NULL,
+        error      TEXT,
+        negative   INTEGER NOT NULL DEFAULT 0,
+        expires_at REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS transcripts_expires ON transcripts (expires_at)",
+)
+
+
+class TranscriptCache:
+    """
+    get(video_id)  -> (items, error) or None on miss
+    put(video_id, items, error)          positive entry, default TTL
+    put_negative(video_id, error)        "no transcript" entry, negative TTL
+    stats()        -> dict of hit/miss counters
+    """
+
+    def __init__(self, path=None, max_items=512, ttl=6 * 3600, negative_ttl=15 * 60,
+                 dumps=json.dumps, loads=json.loads, empty=list):
+        # dumps/loads: how items are (de)serialized for the disk tier; empty(): items of a negative entry
+        self._dumps = dumps
+        self._loads = loads
+        self._empty = empty
+        self.max_items = max(1, int(max_items))
+        self.ttl = float(ttl)
+        self.negative_ttl = float(negative_ttl)
+        self._lru = OrderedDict()  # video_id -> (expires_at, items, error, negative)
+        self._lock = threading.Lock()  # LRU + counters only; never held during disk I/O or (de)serialization
+        self._db_lock = threading.Lock()  # the SQLite connection
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "purged": 0,
+        }
+        self._next_purge = 0.0
+        self._db = None
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                for stmt in _SCHEMA:
+                    self._db.execute(stmt)
+                self._db.commit()
+            except Exception as e:
+                print("DEBUG: transcript cache disk tier disabled:", repr(e))
+                self._db = None
+
+    # ---- lookups ----
+    def get(self, video_id: str):
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(video_id)
+            if entry is not None:
+                if entry[0] > now:
+                    self._lru.move_to_end(video_id)
+                    self._count_hit("memory_hits", entry[3])
+                    return entry[1], entry[2]
+                del self._lru[video_id]
+                self._counters["expired"] += 1
+
+        # disk read + decode (up to ~1 MB of JSON) happen without self._lock,
+        # so memory hits on other threads aren't blocked behind them
+        row = self._disk_get(video_id)
+        if row is not None:
+            expires_at, items, error, negative = row
+            if expires_at > now:
+                with self._lock:
+                    # a put() that raced this read wins over the older disk row
+                    if video_id not in self._lru:
+                        self._remember(video_id, (expires_at, items, error, negative))
+                    self._count_hit("disk_hits", negative)
+                return items, error
+            self._disk_delete(video_id)
+            with self._lock:
+                self._counters["expired"] += 1
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    # ---- writes ----
+    def put(self, video_id: str, items, error=None, ttl=None):
+        self._store(video_id, items, error, False, self.ttl if ttl is None else ttl)
+
+    def put_negative(self, video_id: str, error: str, ttl=None):
+        self._store(video_id, self._empty(), error, True, self.negative_ttl if ttl is None else ttl)
+
+    def invalidate(self, video_id: str):
+        with self._lock:
+            self._lru.pop(video_id, None)
+        self._disk_delete(video_id)
+
+    def purge_expired(self):
+        """Delete expired rows from the disk tier; returns how many were removed."""
+        if self._db is None:
+            return 0
+        try:
+            with self._db_lock:
+                cur = self._db.execute("DELETE FROM transcripts WHERE expires_at <= ?", (time.time(),))
+                self._db.commit()
+        except Exception as e:
+            print("DEBUG: transcript cache purge error:", repr(e))
+            return 0
+        with self._lock:
+            self._counters["purged"] += cur.rowcount
+        return cur.rowcount
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._counters)
+            out["memory_items"] = len(self._lru)
+        hits = out["memory_hits"] + out["disk_hits"]
+        total = hits + out["misses"]
+        out["hit_rate"] = round(hits / total, 4) if total else 0.0
+        return out
+
+    # ---- internals ----
+    # (_count_hit / _remember: caller holds self._lock)
+    def _count_hit(self, tier, negative):
+        self._counters[tier] += 1
+        if negative:
+            self._counters["negative_hits"] += 1
+
+    def _remember(self, video_id, entry):
+        self._lru[video_id] = entry
+        self._lru.move_to_end(video_id)
+        while len(self._lru) > self.max_items:
+            self._lru.popitem(last=False)
+
+    def _store(self, video_id, items, error, negative, ttl):
+        if ttl <= 0:
+            return
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._remember(video_id, (expires_at, items, error, negative))
+        if self._db is None:
+            return
+        try:
+            data = self._dumps(items)
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO transcripts (video_id, items, error, negative, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (video_id, data, error, int(negative), expires_at),
+                )
+                self._db.commit()
+        except Exception as e:
+            print("DEBUG: transcript cache write error:", repr(e))
+        # rows are otherwise only dropped when their own video_id is looked up again
+        if now >= self._next_purge:
+            self._next_purge = now + PURGE_INTERVAL
+            self.purge_expired()
+
+    def _disk_get(self, video_id):
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT expires_at, items, error, negative FROM transcripts WHERE video_id = ?",
+                    (video_id,),
+                ).fetchone()
+            if row is None:
+                return None
+            return row[0], self._loads(row[1]), row[2], bool(row[3])
+        except Exception as e:
+            print("DEBUG: transcript cache read error:", repr(e))
+            return None
+
+    def _disk_delete(self, video_id):
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute("DELETE FROM transcripts WHERE video_id = ?", (video_id,))
+                self._db.commit()
+        except Exception as e:
+            print("DEBUG: transcript cache delete error:", repr(e))
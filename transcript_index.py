@@ -0,0 +1,150 @@
+# transcript_index.py
+"""
+Full-text index of analyzed transcripts (SQLite FTS5, porter stemming).
+
+Captions are indexed in short segments of SEGMENT_CAPTIONS consecutive
+captions, so a phrase split across two caption lines still matches and every
+hit carries the start time of its segment. Segments live in a plain table
+(indexed by video_id) that the FTS table uses as external content; a video is
+re-indexed only when its transcript digest changes.
+
+    index = TranscriptIndex("transcripts_fts.sqlite3")
+    index.add("dQw4w9WgXcQ", transcript)      # transcript.Transcript
+    index.search("moon landing faked", limit=20)
+      -> [{"video_id", "start", "snippet", "score"}, ...]  best first
+"""
+import re
+import sqlite3
+import threading
+import time
+
+SEGMENT_CAPTIONS = 4
+SNIPPET_TOKENS = 16
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS indexed_videos (
+        video_id TEXT PRIMARY KEY,
+        digest   TEXT NOT NULL,
+        segments INTEGER NOT NULL,
+        indexed  REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS segments (
+        id       INTEGER PRIMARY KEY,
+        video_id TEXT NOT NULL,
+        start    REAL NOT NULL,
+        text     TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS segments_video ON segments (video_id)",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+        text, content='segments', content_rowid='id', tokenize='porter unicode61'
+    )""",
+)
+
+_TERM_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+
+def fts_query(text: str) -> str:
+    """
+    User text -> FTS5 MATCH expression: "quoted phrases" stay phrases, every other
+    word is a required term. Everything is quoted, so FTS operators/syntax in the
+    input can't cause errors. "" if there is nothing to search for.
+    """
+    parts = []
+    for phrase, word in _TERM_RE.findall(text or ""):
+        term = (phrase or word).replace('"', " ").strip()
+        if re.search(r"\w", term):
+            parts.append('"' + term + '"')
+    return " ".join(parts)
+
+
+class TranscriptIndex:
+    def __init__(self, path=":memory:"):
+        self._lock = threading.Lock()
+        self._counters = {"indexed": 0, "unchanged": 0, "searches": 0}
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        if path and path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        for stmt in _SCHEMA:
+            self._db.execute(stmt)
+        self._db.commit()
+        self._videos = self._db.execute("SELECT COUNT(*) FROM indexed_videos").fetchone()[0]
+
+    def add(self, video_id: str, transcript) -> bool:
+        """(Re)index a video's transcript; False if it was already indexed with the same content."""
+        if not transcript:
+            return False
+        digest = transcript.digest()
+        with self._lock:
+            row = self._db.execute("SELECT digest FROM indexed_videos WHERE video_id = ?", (video_id,)).fetchone()
+            if row is not None and row[0] == digest:
+                self._counters["unchanged"] += 1
+                return False
+        segments = []
+        for i in range(0, len(transcript), SEGMENT_CAPTIONS):
+            part = transcript[i:i + SEGMENT_CAPTIONS]
+            segments.append((video_id, part.start_at(0), part.text(" ")))
+        with self._lock:
+            # re-check: another thread may have indexed it while segments were built
+            row = self._db.execute("SELECT digest FROM indexed_videos WHERE video_id = ?", (video_id,)).fetchone()
+            if row is not None and row[0] == digest:
+                self._counters["unchanged"] += 1
+                return False
+            if row is not None:
+                self._delete(video_id)
+            else:
+                self._videos += 1
+            cur = self._db.cursor()
+            cur.executemany("INSERT INTO segments (video_id, start, text) VALUES (?, ?, ?)", segments)
+            # the video's old segments are gone, so all its rows are new: mirror them into FTS in one statement
+            cur.execute(
+                "INSERT INTO segments_fts (rowid, text) SELECT id, text FROM segments WHERE video_id = ?",
+                (video_id,),
+            )
+            cur.execute(
+                "INSERT OR REPLACE INTO indexed_videos (video_id, digest, segments, indexed) VALUES (?, ?, ?, ?)",
+                (video_id, digest, len(segments), time.time()),
+            )
+            self._db.commit()
+            self._counters["indexed"] += 1
+        return True
+
+    def _delete(self, video_id):
+        # external-content FTS: rows are removed with the 'delete' command and their old text
+        self._db.execute(
+            "INSERT INTO segments_fts (segments_fts, rowid, text) "
+            "SELECT 'delete', id, text FROM segments WHERE video_id = ?",
+            (video_id,),
+        )
+        self._db.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+
+    def search(self, text: str, limit=20, video_id=None):
+        """Ranked (bm25) segment hits for text; [] for an empty query."""
+        query = fts_query(text)
+        if not query:
+            return []
+        sql = (
+            "SELECT s.video_id, s.start, snippet(segments_fts, 0, '[', ']', ' ... ', ?), bm25(segments_fts) "
+            "FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid "
+            "WHERE segments_fts MATCH ?"
+        )
+        params = [SNIPPET_TOKENS, query]
+        if video_id:
+            sql += " AND s.video_id = ?"
+            params.append(video_id)
+        sql += " ORDER BY bm25(segments_fts) LIMIT ?"
+        params.append(max(1, int(limit)))
+        with self._lock:
+            self._counters["searches"] += 1
+            rows = self._db.execute(sql, params).fetchall()
+        # bm25() is lower-is-better and negative; report higher-is-better
+        return [
+            {"video_id": v, "start": start, "snippet": snip, "score": round(-score, 4)}
+            for v, start, snip, score in rows
+        ]
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._counters)
+            out["videos"] = self._videos
+        return out
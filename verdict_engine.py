@@ -0,0 +1,271 @@
+# verdict_engine.py
+"""
+Keyword verdict engine: one pass over transcript items, any lexicon size.
+
+Lexicon phrases are tokenized into words and compiled into a word-level
+Aho-Corasick automaton, so the transcript is scanned once no matter how many
+phrases there are, matches respect word boundaries ("lie" doesn't fire
+inside "believe"), and phrases may span caption boundaries.
+
+Lexicon file (JSON), labels listed in precedence order - the first label
+with any match wins, otherwise the default label:
+    {"default": "Verify", "labels": {"False": ["hoax", ...], "True": [...]}}
+
+WindowedVerdict scores fixed time windows instead of the whole transcript
+and keeps the scanner state between calls, so a growing (live) transcript
+is only scanned from the first new caption on.
+"""
+import json
+import re
+import threading
+from collections import deque
+
+DEFAULT_LEXICON = {
+    "default": "Verify",
+    "labels": {
+        # misinformation / disclaimer markers
+        "False": ["conspiracy theory", "false claim", "debunked", "hoax", "not true"],
+        # scientific / factual basis markers
+        "True": ["peer-reviewed study", "scientific evidence", "data shows", "verifiable"],
+    },
+}
+
+# cap on evidence entries returned per label (matching itself is not capped)
+MAX_EVIDENCE = 50
+# same, per window of a WindowedVerdict timeline
+MAX_WINDOW_EVIDENCE = 10
+
+_WORD_RE = re.compile(r"[0-9a-z]+(?:['\-][0-9a-z]+)*")
+
+
+def tokenize(text: str):
+    return _WORD_RE.findall(text.lower())
+
+
+def load_lexicon(path=None):
+    """Read a lexicon JSON file; DEFAULT_LEXICON when path is empty."""
+    if not path:
+        return DEFAULT_LEXICON
+    with open(path, "r", encoding="utf-8") as fh:
+        lex = json.load(fh)
+    if "labels" not in lex:
+        # also accept the bare {"False": [...], "True": [...]} form
+        lex = {"default": "Verify", "labels": lex}
+    return lex
+
+
+class VerdictEngine:
+    def __init__(self, lexicon=None):
+        lexicon = lexicon or DEFAULT_LEXICON
+        self.default = lexicon.get("default", "Verify")
+        self.labels = list(lexicon["labels"].keys())
+        self._build(lexicon["labels"])
+
+    # ---- automaton construction ----
+    def _build(self, labels):
+        self._goto = [{}]  # node -> {word: node}
+        self._out = [[]]  # node -> [(phrase, label, n_words)] ending here
+        for label, phrases in labels.items():
+            for phrase in phrases:
+                words = tokenize(phrase)
+                if not words:
+                    continue
+                node = 0
+                for w in words:
+                    nxt = self._goto[node].get(w)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[node][w] = nxt
+                        self._goto.append({})
+                        self._out.append([])
+                    node = nxt
+                self._out[node].append((" ".join(words), label, len(words)))
+
+        # breadth-first failure links; outputs of the fail target are merged in
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for w, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and w not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(w, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self.max_words = max((n for outs in self._out for _, _, n in outs), default=0)
+
+    # ---- scanning ----
+    def new_state(self):
+        """Scanner position: automaton node + start times of the last few words."""
+        return ScanState(self.max_words)
+
+    def scan(self, captions, state=None):
+        """
+        Yield (phrase, label, start_seconds) for every match, in transcript order.
+        captions: iterable of (start, text) pairs, e.g. a transcript.Transcript.
+        Pass the same state to consecutive calls to continue a scan across
+        appended captions (phrases spanning the boundary still match).
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = state or self.new_state()
+        node = state.node
+        # start times of the last few words, to timestamp phrases that began in an earlier caption
+        recent_starts = state.recent_starts
+        try:
+            for start, text in captions:
+                for w in tokenize(text or ""):
+                    recent_starts.append(start)
+                    while node and w not in goto[node]:
+                        node = fail[node]
+                    node = goto[node].get(w, 0)
+                    for phrase, label, n in out[node]:
+                        yield phrase, label, recent_starts[-n]
+        finally:
+            state.node = node
+
+    def check(self, captions):
+        """
+        Return {"verdict": label, "evidence": [{"phrase", "label", "start"}, ...]}.
+        Verdict is the highest-precedence label with a match, else the default.
+        """
+        evidence = {label: [] for label in self.labels}
+        for phrase, label, start in self.scan(captions):
+            if len(evidence[label]) < MAX_EVIDENCE:
+                evidence[label].append({"phrase": phrase, "label": label, "start": start})
+        verdict = next((label for label in self.labels if evidence[label]), self.default)
+        return {
+            "verdict": verdict,
+            "evidence": [e for label in self.labels for e in evidence[label]],
+        }
+
+
+class ScanState:
+    __slots__ = ("node", "recent_starts")
+
+    def __init__(self, max_words):
+        self.node = 0
+        self.recent_starts = deque(maxlen=max(1, max_words))
+
+
+class WindowedVerdict:
+    """
+    Incremental per-window verdicts for one transcript.
+
+    Windows are [k * step, k * step + window) seconds (step defaults to window,
+    i.e. back-to-back windows; a smaller step gives overlapping sliding windows).
+    A match counts towards every window containing its start time.
+
+        wv = WindowedVerdict(engine, window=60)
+        wv.update(transcript)   # first call scans everything
+        wv.update(transcript)   # later calls scan only captions appended since
+        -> {"window", "step", "timeline": [...], "aggregate": {...}, "updated": [window indexes]}
+
+    The aggregate's verdict and evidence are what check() returns for the whole
+    transcript, so a caller with a window doesn't need a separate full scan.
+    If the already-scanned part of the transcript changed (not just grown), it is rescored from scratch.
+    """
+
+    def __init__(self, engine, window=60.0, step=None):
+        self.engine = engine
+        self.window = float(window)
+        self.step = float(step or window)
+        if self.window <= 0 or self.step <= 0 or self.step > self.window:
+            raise ValueError("need 0 < step <= window")
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._state = self.engine.new_state()
+        self._counts = {}     # window index -> {label: matches}
+        self._evidence = {}   # window index -> [evidence dicts]
+        self._entries = {}    # window index -> timeline entry (rebuilt only when touched)
+        self._totals = {label: 0 for label in self.engine.labels}
+        self._all_evidence = {label: [] for label in self.engine.labels}  # as in check()
+        self.consumed = 0     # captions scanned so far
+        self._last = None     # (start, text) of the last scanned caption
+        self._end = 0.0       # latest caption start seen
+        self.rescans = 0
+
+    def _windows_of(self, t):
+        # every k with k * step <= t < k * step + window
+        last = int(t // self.step)
+        first = max(0, int((t - self.window) // self.step) + 1)
+        return range(first, last + 1)
+
+    def append(self, captions):
+        """Score newly appended (start, text) captions; returns the touched window indexes."""
+        touched = set()
+        for phrase, label, start in self.engine.scan(self._track(captions), self._state):
+            self._totals[label] += 1
+            if len(self._all_evidence[label]) < MAX_EVIDENCE:
+                self._all_evidence[label].append({"phrase": phrase, "label": label, "start": start})
+            for k in self._windows_of(start):
+                counts = self._counts.setdefault(k, {})
+                counts[label] = counts.get(label, 0) + 1
+                ev = self._evidence.setdefault(k, [])
+                if len(ev) < MAX_WINDOW_EVIDENCE:
+                    ev.append({"phrase": phrase, "label": label, "start": start})
+                touched.add(k)
+        for k in touched:
+            self._entries.pop(k, None)
+        return sorted(touched)
+
+    def _track(self, captions):
+        for start, text in captions:
+            self.consumed += 1
+            self._last = (start, text)
+            self._end = max(self._end, start)
+            yield start, text
+
+    def update(self, transcript):
+        """
+        Bring the scores up to date with `transcript` (a transcript.Transcript that may have
+        grown since the last call) and return the result dict.
+        """
+        with self._lock:
+            n = self.consumed
+            if n and (len(transcript) < n or transcript[n - 1] != self._last):
+                self._reset()
+                self.rescans += 1
+                n = 0
+            touched = self.append(transcript[n:])
+            return self._result(touched)
+
+    def _entry(self, k):
+        # entries hold copies of the window's counts/evidence and are replaced (never
+        # mutated) when the window is touched, so returned results stay stable
+        entry = self._entries.get(k)
+        if entry is None:
+            counts = dict(self._counts.get(k, {}))
+            entry = self._entries[k] = {
+                "start": k * self.step,
+                "end": k * self.step + self.window,
+                "verdict": next((label for label in self.engine.labels if counts.get(label)), self.engine.default),
+                "counts": counts,
+                "evidence": list(self._evidence.get(k, [])),
+            }
+        return entry
+
+    def _result(self, touched):
+        # caller holds self._lock
+        n_windows = int(self._end // self.step) + 1 if self.consumed else 0
+        timeline = [self._entry(k) for k in range(n_windows)]
+        flagged = {label: 0 for label in self.engine.labels}
+        for entry in timeline:
+            if entry["verdict"] in flagged:
+                flagged[entry["verdict"]] += 1
+        return {
+            "window": self.window,
+            "step": self.step,
+            "timeline": timeline,
+            "aggregate": {
+                "verdict": next((label for label in self.engine.labels if self._totals[label]), self.engine.default),
+                "matches": dict(self._totals),
+                "windows": flagged,
+                "captions": self.consumed,
+                "evidence": [e for label in self.engine.labels for e in self._all_evidence[label]],
+            },
+            "updated": list(touched),
+        }
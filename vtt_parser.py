@@ -0,0 +1,150 @@
+# vtt_parser.py
+"""
+Line-streaming WebVTT cue parser for the yt-dlp subtitle fallback.
+
+Reads one line at a time (never the whole file) and yields caption items as
+soon as each cue ends. YouTube auto-captions are "rolling": each cue that adds
+a line is followed by a ~10ms "hold" cue repeating that line, and the next cue
+starts with it again. Lines carried across a hold cue (into or out of it, the
+cues touching) are collapsed so each spoken line is emitted once, at the time
+it first appears. Tracks without hold cues (manual captions) are left as is,
+including lines repeated from one cue to the next.
+"""
+import re
+from itertools import chain as _chain
+
+# "00:01:23.456 --> 00:01:25.000 align:start position:0%" (hours optional, "," allowed)
+_TS = r"(?:\d{1,2}:)?\d{1,2}:\d{2}[.,]\d{2,3}"
+_TIMING_RE = re.compile(r"\s*(" + _TS + r")\s*-->\s*(" + _TS + r")?")
+# inline word timings / styling: <00:00:01.234>, <c>, </c>, <c.colorE5E5E5>, <b>, ...
+_TAG_RE = re.compile(r"<[^>]*>")
+_ENTITIES = (("&amp;", "&"), ("&lt;", "<"), ("&gt;", ">"), ("&nbsp;", " "))
+
+# cues that start within this many seconds of the previous cue's end "touch" it
+ROLLING_GAP = 0.001
+# YouTube's hold cues last 10ms
+ROLLING_HOLD = 0.05
+
+
+def vtt_time_to_seconds(ts: str) -> float:
+    """'01:02:03.456' / '02:03.456' / '02:03,456' -> seconds."""
+    if len(ts) == 12 and ts[2] == ":" and ts[5] == ":" and ts[8] == ".":
+        # "HH:MM:SS.mmm", what YouTube (and most files) write
+        try:
+            return int(ts[:2]) * 3600 + int(ts[3:5]) * 60 + float(ts[6:])
+        except ValueError:
+            pass
+    h, m, s = 0, 0, 0.0
+    parts = ts.strip().replace(",", ".").split(":")
+    try:
+        if len(parts) == 3:
+            h, m, s = int(parts[0]), int(parts[1]), float(parts[2])
+        elif len(parts) == 2:
+            m, s = int(parts[0]), float(parts[1])
+        else:
+            s = float(parts[0])
+    except ValueError:
+        return 0.0
+    return h * 3600 + m * 60 + s
+
+
+def _clean(line: str) -> str:
+    if "<" in line:
+        line = _TAG_RE.sub("", line)
+    if "&" in line:
+        for ent, ch in _ENTITIES:
+            line = line.replace(ent, ch)
+    line = line.strip()
+    return " ".join(line.split()) if "  " in line else line
+
+
+def _rolling_fresh(text_lines, start, end, prev):
+    """
+    text_lines of the cue [start, end) minus the lines rolled over from prev,
+    the (lines, start, end) of the previous cue with text (or None).
+    """
+    if prev is None or start > prev[2] + ROLLING_GAP:
+        return text_lines
+    if end - start > ROLLING_HOLD and prev[2] - prev[1] > ROLLING_HOLD:
+        # neither cue is a hold cue: not a rolling track, repeats are real
+        return text_lines
+    return [t for t in text_lines if t not in prev[0]]
+
+
+def _blocks(lines):
+    """
+    Group lines (without line endings) into blocks separated by empty lines;
+    a second timing line also starts a new block.
+    """
+    block, timed = [], False
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if not line:
+            if block:
+                yield block
+                block, timed = [], False
+            continue
+        if "-->" in line:
+            if timed:
+                yield block
+                block = []
+            timed = True
+        block.append(line)
+    if block:
+        yield block
+
+
+def iter_vtt_cues(lines, collapse_rolling=True):
+    """
+    Yield (start_seconds, text) per cue from an iterable of lines (e.g. an open file).
+    With collapse_rolling, YouTube rolling repeats are dropped (see module docstring)
+    and cues left empty are skipped.
+    """
+    lines = iter(lines)
+    first = next(lines, "")
+    lines = _chain((first.lstrip("\ufeff"),), lines)
+    to_seconds = vtt_time_to_seconds
+    prev = None  # (text lines, start, end) of the previous cue with text
+    last_end, last_end_s = None, 0.0  # raw + converted end of the last cue (cues are usually contiguous)
+
+    for block in _blocks(lines):
+        # per WebVTT only an empty line ends a block; YouTube puts " " lines inside cues
+        head = block[0]
+        if "-->" in head:
+            payload = block[1:]
+        elif len(block) > 1 and "-->" in block[1] and not head.startswith(("WEBVTT", "NOTE", "STYLE", "REGION")):
+            head, payload = block[1], block[2:]  # cue identifier line first
+        else:
+            continue  # header / NOTE / STYLE / REGION block
+        timing = _TIMING_RE.match(head)
+        if timing is None:
+            continue
+        # block-wide checks: plain text (the common case) only needs trimming
+        text = "\n".join(payload)
+        if "<" in text or "&" in text or "  " in text:
+            text_lines = [t for t in map(_clean, payload) if t]
+        else:
+            text_lines = [t for t in map(str.strip, payload) if t]
+        if not text_lines:
+            continue
+
+        start, end = timing.groups()
+        start_s = last_end_s if start == last_end else to_seconds(start)
+        fresh = text_lines
+        if collapse_rolling:
+            if end is None:
+                prev = None
+            else:
+                end_s = to_seconds(end)
+                last_end, last_end_s = end, end_s
+                fresh = _rolling_fresh(text_lines, start_s, end_s, prev)
+                prev = (text_lines, start_s, end_s)
+        if fresh:
+            yield start_s, " ".join(fresh)
+
+
+def iter_vtt_file(path, collapse_rolling=True):
+    """Yield {"start": float, "text": str} items from a .vtt file, streaming line by line."""
+    with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+        for start, text in iter_vtt_cues(fh, collapse_rolling=collapse_rolling):
+            yield {"start": start, "text": text}